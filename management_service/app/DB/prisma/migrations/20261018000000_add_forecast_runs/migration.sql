@@ -0,0 +1,17 @@
+-- CreateTable
+CREATE TABLE "forecast_runs" (
+    "runid" SERIAL NOT NULL,
+    "startedat" TIMESTAMPTZ(6) DEFAULT CURRENT_TIMESTAMP,
+    "completedat" TIMESTAMPTZ(6),
+
+    CONSTRAINT "forecast_runs_pkey" PRIMARY KEY ("runid")
+);
+
+-- AlterTable
+ALTER TABLE "forecasts" ADD COLUMN     "runid" INTEGER;
+
+-- CreateIndex
+CREATE INDEX "idx_forecasts_runid" ON "forecasts"("runid");
+
+-- AddForeignKey
+ALTER TABLE "forecasts" ADD CONSTRAINT "fk_forecasts_runid" FOREIGN KEY ("runid") REFERENCES "forecast_runs"("runid") ON DELETE CASCADE ON UPDATE NO ACTION;
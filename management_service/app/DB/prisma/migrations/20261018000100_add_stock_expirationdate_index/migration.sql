@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "idx_stock_expirationdate" ON "stock"("expirationdate");
@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "idx_orderitems_orderid" ON "orderitems"("orderid");
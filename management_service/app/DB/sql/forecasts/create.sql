@@ -1,6 +1,19 @@
+CREATE TABLE forecast_runs (
+    runID INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    startedAt TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    completedAt TIMESTAMP WITH TIME ZONE
+);
+
 CREATE TABLE forecasts (
     forecastID INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     recommendation TEXT,
     recommendationFor TIMESTAMP WITH TIME ZONE,
-    createdAt TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+    createdAt TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    runID INT,
+    CONSTRAINT fk_forecasts_runID
+      FOREIGN KEY (runID)
+      REFERENCES forecast_runs(runID)
+      ON DELETE CASCADE
+);
+
+CREATE INDEX idx_forecasts_runID ON forecasts (runID);
@@ -8,3 +8,5 @@ CREATE TABLE orderItems (
     CONSTRAINT fk_order FOREIGN KEY (orderID) REFERENCES orders(orderID),
     CONSTRAINT fk_menu_item FOREIGN KEY (menuItemID) REFERENCES menuItems(menuItemID)
 );
+
+CREATE INDEX idx_orderitems_orderid ON orderItems (orderID);
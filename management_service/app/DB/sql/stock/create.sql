@@ -12,3 +12,5 @@ CREATE TABLE stock (
       FOREIGN KEY (ingredientID)
       REFERENCES ingredients(ingredientID)
 );
+
+CREATE INDEX idx_stock_expirationDate ON stock (expirationDate);
@@ -12,13 +12,24 @@ forecastRouter.get("/", async (_, res: Response) => {
   try{
     console.log("Retrieving forecast");
 
+    // Only serve the latest completed forecast run; rows from a run that is still
+    // being written stay hidden until the pipeline marks it complete
+    const latestRun = await Db.forecast_runs.findFirst({
+      where: { completedat: { not: null } },
+      orderBy: { runid: "desc" },
+      select: { runid: true },
+    });
+
     let forecast: forecasts[] = [];
     forecast = await Db.forecasts.findMany({
+      // Before the first versioned run, fall back to forecasts written without a run id
+      where: { runid: latestRun ? latestRun.runid : null },
       select:{
         forecastid: true,
         recommendation: true,
         recommendationfor: true,
         createdat: true,
+        runid: true,
       }
     });
     res.status(200).json({ forecast: forecast });
@@ -0,0 +1,79 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_utils import connect_to_db, pooled_connection, close_pool
+
+# prediction_create.py checks out a connection in __main__, in fetch_historical_orders,
+# in fetch_menu_items_ingredients and again for the writers
+SESSIONS_PER_RUN = 4
+
+
+def _ping(conn):
+    """Run a trivial query so every session does at least one round trip"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT 1')
+    cursor.fetchone()
+    cursor.close()
+
+
+def time_direct_connections(runs):
+    """Time runs that open and close a fresh connection for every session"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(SESSIONS_PER_RUN):
+            conn = connect_to_db()
+            if conn is None:
+                return []
+            _ping(conn)
+            conn.close()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_pooled_connections(runs):
+    """Time runs that borrow every session from the shared pool"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(SESSIONS_PER_RUN):
+            with pooled_connection() as conn:
+                if conn is None:
+                    return []
+                _ping(conn)
+        timings.append(time.perf_counter() - start)
+    close_pool()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-run connection overhead with and without the pool')
+    parser.add_argument('--runs', type=int, default=20, help='Number of simulated pipeline runs (default: 20)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  CONNECTION POOL BENCHMARK")
+    print("=" * 60)
+
+    direct = time_direct_connections(args.runs)
+    pooled = time_pooled_connections(args.runs)
+
+    if not direct or not pooled:
+        print("❌ Could not connect to the database. Check DATABASE_URL in .env")
+        sys.exit(1)
+
+    direct_ms = statistics.mean(direct) * 1000
+    pooled_ms = statistics.mean(pooled) * 1000
+
+    print(f"\nSessions per run: {SESSIONS_PER_RUN}, runs: {args.runs}")
+    print(f"  - Direct connections: {direct_ms:.1f} ms per run")
+    print(f"  - Pooled connections: {pooled_ms:.1f} ms per run (includes opening the pool once)")
+    print(f"  - Connect overhead removed: {direct_ms - pooled_ms:.1f} ms per run ({direct_ms / pooled_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
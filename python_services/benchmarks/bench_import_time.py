@@ -0,0 +1,90 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Command-line entry points, imported the way cron runs them
+ENTRY_POINTS = (
+    'prediction_create',
+    'generate_and_populate_orders',
+    'generate_and_populate_orderItems',
+    'generate_and_pop_stock',
+    'populate_waste',
+)
+
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+    --------
+    tuple
+        (total import time of the module in ms, [(cumulative ms, name), ...]
+        for every module it imports directly, heaviest first)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SERVICE_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total, imports = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        try:
+            cumulative_ms = int(cumulative) / 1000
+        except ValueError:
+            continue  # header line
+        # The module itself is indented by one space, its direct imports by three
+        if name.startswith('   ') and not name.startswith('    '):
+            imports.append((cumulative_ms, name.strip()))
+        if name.strip() == module:
+            total = cumulative_ms
+    imports.sort(reverse=True)
+    return total, imports
+
+
+def help_wall_time(module, runs):
+    """Median wall time of `python <module>.py --help`, which parses arguments and exits"""
+    script = os.path.join(SERVICE_DIR, f'{module}.py')
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, '--help'], cwd=SERVICE_DIR, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure start-up import cost of each command-line entry point')
+    parser.add_argument('--runs', type=int, default=3, help='Interpreter launches per entry point for wall time (default: 3)')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest direct imports listed per entry point (default: 5)')
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS), help='Entry points to measure (default: all)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  IMPORT TIME BENCHMARK")
+    print("=" * 60)
+
+    for module in args.modules:
+        try:
+            total, imports = import_profile(module)
+        except RuntimeError as e:
+            print(f"  - {module:<34} import failed: {e}")
+            continue
+        wall = help_wall_time(module, args.runs)
+        print(f"  - {module:<34} import {total:8.1f} ms   --help {wall * 1000:8.1f} ms")
+        for cumulative_ms, name in imports[:args.top]:
+            print(f"      {cumulative_ms:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
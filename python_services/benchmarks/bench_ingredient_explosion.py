@@ -0,0 +1,82 @@
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import sys
+import time
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculate_ingredient_needs import hourly_usage_from_orders_loop
+from fetch_menu_ingredients import recipe_dictionary
+from recipe_matrix import hourly_usage_from_orders
+from recipe_store import build_recipe_store
+
+
+def make_synthetic_data(days, orders_per_day, menu_size, ingredient_count, seed):
+    """Build order dicts and a recipe store shaped like the fetcher outputs"""
+    rng = random.Random(seed)
+    ingredient_ids = list(range(1, ingredient_count + 1))
+    menu_item_ids = list(range(1, menu_size + 1))
+    recipe_rows = [
+        (menu_item, f"Menu Item {menu_item}", ingredient, rng.randint(1, 3))
+        for menu_item in menu_item_ids
+        for ingredient in sorted(rng.sample(ingredient_ids, rng.randint(2, min(8, ingredient_count))))
+    ]
+
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    orders = []
+    for i in range(days * orders_per_day):
+        orders.append({
+            'orderid': i,
+            'ordertimestamp': start + datetime.timedelta(seconds=rng.randrange(days * 86400)),
+            'menuitemid': rng.choice(menu_item_ids),
+        })
+    orders.sort(key=lambda order: order['ordertimestamp'])
+    return orders, build_recipe_store(recipe_rows, 'synthetic')
+
+
+def time_quietly(func, *args):
+    """Run func with its progress output suppressed and return (seconds, result)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the per-order loop with the recipe-matrix ingredient explosion')
+    parser.add_argument('--days', type=int, default=90, help='Days of synthetic history (default: 90)')
+    parser.add_argument('--orders-per-day', type=int, default=300, help='Order items per day (default: 300)')
+    parser.add_argument('--menu-size', type=int, default=40, help='Number of menu items (default: 40)')
+    parser.add_argument('--ingredients', type=int, default=60, help='Number of ingredients (default: 60)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  INGREDIENT EXPLOSION BENCHMARK")
+    print("=" * 60)
+
+    orders, recipes = make_synthetic_data(args.days, args.orders_per_day, args.menu_size, args.ingredients, args.seed)
+    print(f"{len(orders)} order items, {len(recipes['menu_item_ids'])} menu items, {args.ingredients} ingredients")
+
+    # The vectorized engine reads the columnar fetch, so give it columns rather than dicts
+    order_columns = pd.DataFrame({
+        'ordertimestamp': [order['ordertimestamp'] for order in orders],
+        'menuitemid': [order['menuitemid'] for order in orders],
+    })
+
+    loop_seconds, loop_df = time_quietly(hourly_usage_from_orders_loop, orders, recipe_dictionary(recipes))
+    vectorized_seconds, vectorized_df = time_quietly(hourly_usage_from_orders, order_columns, recipes)
+
+    max_difference = (loop_df - vectorized_df[loop_df.columns]).abs().max().max()
+
+    print(f"  - Per-order loop:  {loop_seconds:.3f} s")
+    print(f"  - Recipe matrix:   {vectorized_seconds:.3f} s ({loop_seconds / vectorized_seconds:.1f}x faster)")
+    print(f"  - Largest per-cell difference: {max_difference:.6f} units")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from dotenv import load_dotenv
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVICE_DIR)
+
+# Prisma migrations, applied in folder order to build the schema in an empty database
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(SERVICE_DIR), 'management_service', 'app', 'DB', 'prisma', 'migrations'
+)
+
+# Tables emptied before seeding; the benchmark database is assumed to be disposable
+RESET_TABLES_QUERY = """
+TRUNCATE orderitems, orders, menuitemingredients, menuitems, ingredients, forecasts, forecast_runs
+RESTART IDENTITY CASCADE
+"""
+
+INGREDIENT_CATEGORIES = ('Buns', 'Patties', 'Chicken', 'Fries', 'Cheese', 'Produce', 'Sauces', 'Drinks', 'Other')
+MENU_CATEGORIES = ('Meals', 'Entrees', 'Salads', 'Sides', 'Beverages')
+
+# Share of seeded menu items flagged isPopular
+POPULAR_SHARE = 0.2
+
+
+def _peak_rss_mb(who):
+    """Peak resident set size so far in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def run_stage(results, name, func, *args, rows=None, verbose=False, **kwargs):
+    """
+    Time one pipeline stage and append its measurements to results.
+
+    Parameters:
+    -----------
+    results : list
+        Stage records, appended to in place
+    name : str
+        Stage name in the report
+    func : callable
+        Stage to run
+    rows : callable, optional
+        Maps the stage's return value to the number of rows it processed
+    verbose : bool, optional
+        Let the stage print its progress (default: output suppressed)
+
+    Returns:
+    --------
+    object
+        Whatever func returned
+    """
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+    row_count = int(rows(result)) if rows is not None else None
+    record = {
+        'stage': name,
+        'seconds': round(seconds, 4),
+        'rows': row_count,
+        'rows_per_second': round(row_count / seconds, 1) if row_count is not None and seconds > 0 else None,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+    results.append(record)
+    print(f"  - {name:<32} {seconds:9.3f} s  {row_count if row_count is not None else '':>10}  "
+          f"peak RSS {record['peak_rss_mb']:8.1f} MB", file=sys.stderr)
+    return result
+
+
+def apply_migrations(conn):
+    """Create the schema in an empty database from the Prisma migration files"""
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*', 'migration.sql'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                cursor.execute(f.read())
+    finally:
+        cursor.close()
+        conn.autocommit = False
+
+
+def seed_catalog(conn, menu_size, ingredient_count, seed):
+    """
+    Replace every benchmark table with a synthetic menu.
+
+    Each menu item uses 2-8 distinct ingredients, 1-3 units each, and about
+    POPULAR_SHARE of the menu is flagged isPopular.
+
+    Returns:
+    --------
+    int
+        Number of menu item-ingredient rows written
+    """
+    from psycopg2.extras import execute_values
+
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(RESET_TABLES_QUERY)
+        execute_values(cursor, """
+            INSERT INTO ingredients (ingredientname, thresholdquantity, costperunit, shelflife, category, "servingSize")
+            VALUES %s
+        """, [
+            (f"Ingredient {i}", rng.randint(10, 100), round(rng.uniform(0.1, 5), 2), rng.randint(3, 90),
+             rng.choice(INGREDIENT_CATEGORIES), '1 unit')
+            for i in range(1, ingredient_count + 1)
+        ])
+        execute_values(cursor, """
+            INSERT INTO menuitems (name, price, profit, category, "isPopular")
+            VALUES %s
+        """, [
+            (f"Menu Item {i}", round(rng.uniform(2, 15), 2), round(rng.uniform(0.5, 5), 2),
+             rng.choice(MENU_CATEGORIES), rng.random() < POPULAR_SHARE)
+            for i in range(1, menu_size + 1)
+        ])
+        ingredient_ids = list(range(1, ingredient_count + 1))
+        recipe_rows = [
+            (menu_item, ingredient, rng.randint(1, 3))
+            for menu_item in range(1, menu_size + 1)
+            for ingredient in rng.sample(ingredient_ids, rng.randint(2, min(8, ingredient_count)))
+        ]
+        execute_values(cursor, "INSERT INTO menuitemingredients (menuitemid, ingredientid, quantity) VALUES %s", recipe_rows)
+        conn.commit()
+        return len(recipe_rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def write_forecasts(conn, forecasts, recommendations, traffic_recommendations):
+    """The Step 5 writers from prediction_create, as one stage; returns forecast rows written"""
+    from prediction_create import store_forecast_run
+
+    prep_ids, traffic_ids = store_forecast_run(conn, forecasts, recommendations, traffic_recommendations, keep=1)
+    return len(prep_ids) + len(traffic_ids)
+
+
+def main():
+    # Load .env first so BENCH_DATABASE_URL can live there and a benchmark URL
+    # that points at the real database is caught
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Seed a disposable Postgres and time every stage of the nightly pipeline')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'), help='Benchmark database (default: BENCH_DATABASE_URL); every pipeline table in it is truncated')
+    parser.add_argument('--init-schema', action='store_true', help='Apply the Prisma migrations first (empty database)')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse the data already in the benchmark database')
+    parser.add_argument('--days', type=int, default=90, help='Days of order history (default: 90)')
+    parser.add_argument('--orders-per-day', type=float, default=400, help='Average orders per day (default: 400)')
+    parser.add_argument('--menu-size', type=int, default=40, help='Number of menu items (default: 40)')
+    parser.add_argument('--ingredients', type=int, default=60, help='Number of ingredients (default: 60)')
+    parser.add_argument('--forecast', type=int, default=7, help='Days to forecast (default: 7)')
+    parser.add_argument('--engine', choices=['incremental', 'sql', 'vectorized', 'python'], default='sql', help='Ingredient aggregation engine (default: sql)')
+    parser.add_argument('--hierarchy', choices=['ingredient', 'menu-item', 'category', 'total'], default='ingredient', help='Forecast level, as in prediction_create.py (default: ingredient)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--verbose', action='store_true', help='Show the pipeline output of every stage')
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('set BENCH_DATABASE_URL or pass --database-url (the database is truncated, never use the real one)')
+    if args.database_url == os.getenv('DATABASE_URL'):
+        parser.error('the benchmark database must not be DATABASE_URL')
+
+    # Point the shared pool at the benchmark database and keep the caches out of cache/,
+    # before any pipeline module is imported
+    os.environ['DATABASE_URL'] = args.database_url
+    cache_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    for variable, filename in (('MODEL_STORE_PATH', 'sarimax_models.json'),
+                               ('USAGE_STORE_PATH', 'hourly_usage.npz'),
+                               ('RECIPE_STORE_PATH', 'recipe_matrix.npz'),
+                               ('RUNTIME_STORE_PATH', 'fit_runtimes.json'),
+                               ('DEMAND_MODEL_STORE_PATH', 'sarimax_demand_models.json'),
+                               ('DEMAND_RUNTIME_STORE_PATH', 'fit_runtimes_demand.json')):
+        os.environ[variable] = os.path.join(cache_dir, filename)
+
+    from db_utils import pooled_connection, close_pool
+    from fetch_orders import fetch_historical_orders
+    from generate_and_populate_orders import copy_orders
+    from generate_and_populate_orderItems import copy_order_items
+    from prediction_create import (
+        calculate_ingredient_needs, forecast_future_needs, forecast_needs_from_demand,
+        prepare_recommendations, generate_traffic_recommendations
+    )
+
+    print("=" * 60, file=sys.stderr)
+    print("  PIPELINE BENCHMARK", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+
+    stages = []
+    started = time.perf_counter()
+    with pooled_connection() as conn:
+        if conn is None:
+            sys.exit("Could not connect to the benchmark database")
+        if args.init_schema:
+            run_stage(stages, 'init_schema', apply_migrations, conn, verbose=args.verbose)
+        if not args.skip_seed:
+            run_stage(stages, 'seed_catalog', seed_catalog, conn, args.menu_size, args.ingredients, args.seed,
+                      rows=lambda count: count, verbose=args.verbose)
+            run_stage(stages, 'seed_orders', copy_orders, conn, args.days, args.orders_per_day, args.seed,
+                      rows=lambda count: count, verbose=args.verbose)
+            run_stage(stages, 'seed_order_items', copy_order_items, conn, args.seed,
+                      rows=lambda count: count, verbose=args.verbose)
+
+    end_date = datetime.datetime.now()
+    start_date = end_date - datetime.timedelta(days=args.days)
+
+    orders = run_stage(stages, 'fetch_historical_orders', fetch_historical_orders, start_date, end_date,
+                       rows=len, verbose=args.verbose)
+    order_items = len(orders)
+    del orders
+
+    ingredients_data = run_stage(stages, 'calculate_ingredient_needs', calculate_ingredient_needs,
+                                 start_date, end_date, engine=args.engine,
+                                 rows=lambda data: order_items, verbose=args.verbose)
+    if ingredients_data['hourly'].empty:
+        sys.exit("No ingredient usage was calculated; check the seeded data")
+
+    if args.hierarchy == 'ingredient':
+        forecasts = run_stage(stages, 'forecast_future_needs', forecast_future_needs, ingredients_data,
+                              args.forecast * 24, use_model_cache=False,
+                              rows=lambda result: result['daily'].shape[1], verbose=args.verbose)
+    else:
+        forecasts = run_stage(stages, 'forecast_needs_from_demand', forecast_needs_from_demand, ingredients_data,
+                              args.forecast * 24, level=args.hierarchy, start_date=start_date, end_date=end_date,
+                              use_model_cache=False, rows=lambda result: result['daily'].shape[1], verbose=args.verbose)
+        if forecasts is None:
+            sys.exit("Menu item demand could not be read; check the seeded data")
+    recommendations = run_stage(stages, 'prepare_recommendations', prepare_recommendations, forecasts,
+                                rows=lambda result: forecasts['daily'].size, verbose=args.verbose)
+    traffic_recommendations = run_stage(stages, 'generate_traffic_recommendations', generate_traffic_recommendations,
+                                        ingredients_data, forecasts, rows=len, verbose=args.verbose)
+
+    with pooled_connection() as conn:
+        run_stage(stages, 'write_forecasts', write_forecasts, conn, forecasts, recommendations, traffic_recommendations,
+                  rows=lambda count: count, verbose=args.verbose)
+    close_pool()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        'benchmark': 'pipeline',
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'days': args.days,
+            'orders_per_day': args.orders_per_day,
+            'menu_size': args.menu_size,
+            'ingredients': args.ingredients,
+            'forecast_days': args.forecast,
+            'engine': args.engine,
+            'hierarchy': args.hierarchy,
+            'seed': args.seed,
+            'seeded': not args.skip_seed,
+        },
+        'order_items': order_items,
+        'total_seconds': round(time.perf_counter() - started, 4),
+        'stages': stages,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,118 @@
 import datetime
 import pandas as pd
-from fetch_orders import fetch_historical_orders
-from fetch_menu_ingredients import fetch_menu_items_ingredients
+from fetch_orders import fetch_historical_orders, fetch_historical_orders_columnar
+from fetch_menu_ingredients import recipe_dictionary
+from fetch_ingredient_usage import fetch_hourly_ingredient_usage
+from usage_store import calculate_hourly_usage_incremental
+from recipe_matrix import hourly_usage_from_orders
+from recipe_store import get_recipe_matrix
 
 
-def calculate_ingredient_needs(start_date=None, end_date=None):
+def calculate_ingredient_needs(start_date=None, end_date=None, engine='sql'):
     """
     Convert order data into ingredient needs broken down by hour.
+    
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+    engine : str, optional
+        'incremental' merges orders newer than the last run into the cached
+        hourly store (usage_store.py); 'sql' aggregates hourly usage inside
+        Postgres; both fall back to the vectorized path if they fail.
+        'vectorized' explodes orders through a sparse recipe matrix; 'python'
+        uses the original per-order loop
+        (default: 'sql')
+        
     Returns:
     --------
     pandas.DataFrame
         DataFrame indexed by hourly timestamps with ingredient columns,
         containing total required quantities per hour.
     """
+    ingredients_df = None
+    if engine == 'incremental':
+        print("Updating the cached hourly ingredient usage store...")
+        ingredients_df = calculate_hourly_usage_incremental(start_date, end_date)
+        if ingredients_df is None:
+            print("⚠️ Incremental update failed. Falling back to the vectorized engine...")
+    elif engine == 'sql':
+        print("Aggregating hourly ingredient usage in the database...")
+        ingredients_df = fetch_hourly_ingredient_usage(start_date, end_date)
+        if ingredients_df is None:
+            print("⚠️ Database aggregation failed. Falling back to the vectorized engine...")
+    
+    if ingredients_df is None:
+        ingredients_df = _calculate_hourly_needs_python(start_date, end_date, vectorized=(engine != 'python'))
+    
+    if ingredients_df.empty:
+        return pd.DataFrame()
+    
+    total_ingredient_usage = ingredients_df.sum().sum()
+    busiest_hour = ingredients_df.sum(axis=1).idxmax()
+    busiest_hour_usage = ingredients_df.sum(axis=1).max()
+    
+    print(f"\n Ingredient Usage Statistics:")
+    print(f"  - Total ingredient usage: {total_ingredient_usage:.2f} units")
+    print(f"  - Busiest hour: {busiest_hour} with {busiest_hour_usage:.2f} units")
+    print(f"  - Average hourly usage: {total_ingredient_usage / len(ingredients_df):.2f} units")
+    
+    # Get the top 5 ingredients by usage
+    top_ingredients = ingredients_df.sum().sort_values(ascending=False).head(5)
+    print(f"\nTop 5 ingredients by usage:")
+    for ingredient, usage in top_ingredients.items():
+        print(f"  - Ingredient {ingredient}: {usage:.2f} units")
+    
+    return ingredients_df
+
+
+def _calculate_hourly_needs_python(start_date=None, end_date=None, vectorized=True):
+    """Fetch every order item and join it against the recipe dictionary in Python"""
     print("Retrieving order history...")
     # date needs to be in the following format: YYYY-MM-DD
-    orders = fetch_historical_orders(start_date, end_date)
+    if vectorized:
+        # Only the two columns the recipe matrix join reads, parsed straight into arrays
+        orders = fetch_historical_orders_columnar(
+            start_date, end_date, columns=('ordertimestamp', 'menuitemid'), aware=True
+        )
+    else:
+        orders = fetch_historical_orders(start_date, end_date)
     
-    if not orders:
+    if not len(orders):
         print("❌ No orders found. Cannot calculate ingredient needs.")
         return pd.DataFrame()
     
     print(f"Retrieved {len(orders)} order items.")
     
     print("Retrieving menu item ingredients...")
-    menu_items = fetch_menu_items_ingredients()
+    recipes = get_recipe_matrix()
     
-    if not menu_items:
+    if recipes is None or not len(recipes['menu_item_ids']):
         print("❌ No menu item ingredients found. Cannot calculate ingredient needs.")
         return pd.DataFrame()
     
-    print(f"Retrieved ingredients for {len(menu_items)} menu items.")
+    print(f"Retrieved ingredients for {len(recipes['menu_item_ids'])} menu items.")
     
+    if vectorized:
+        return hourly_usage_from_orders(orders, recipes)
+    return hourly_usage_from_orders_loop(orders, recipe_dictionary(recipes))
+
+
+def hourly_usage_from_orders_loop(orders, menu_items):
+    """
+    Original per-order implementation of the ingredient explosion, one DataFrame.at
+    write per order item and ingredient. Kept as the reference for
+    recipe_matrix.hourly_usage_from_orders.
+    """
     all_ingredients = set()
     for ingredients in menu_items.values():
         all_ingredients.update(ingredients.keys())
     print(f"Identified {len(all_ingredients)} unique ingredients.")
     
-    if orders:
-        start_time = min(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0)
-        end_time = max(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
-    else:
-        return pd.DataFrame() 
+    start_time = min(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0)
+    end_time = max(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
     
     # Create DataFrame with hourly timestamps
     print(f"Creating hourly ingredient needs from {start_time} to {end_time}...")
@@ -55,36 +126,80 @@ def calculate_ingredient_needs(start_date=None, end_date=None):
     
     for order in orders:
         hour_timestamp = order['ordertimestamp'].replace(minute=0, second=0, microsecond=0)
-        menu_item_name = order['menuitemname']
+        menu_item_id = order['menuitemid']
         
-        if menu_item_name not in menu_items:
+        if menu_item_id not in menu_items:
             skipped_orders += 1
             continue
         
         processed_orders += 1
         
         # Process each ingredient for this menu item
-        for ingredient, amount in menu_items[menu_item_name].items():
+        for ingredient, amount in menu_items[menu_item_id].items():
             ingredients_df.at[hour_timestamp, ingredient] += amount
     # for informational purposes
     print(f"Processed {processed_orders} orders, skipped {skipped_orders} orders.")
     
-    total_ingredient_usage = ingredients_df.sum().sum()
-    busiest_hour = ingredients_df.sum(axis=1).idxmax()
-    busiest_hour_usage = ingredients_df.sum(axis=1).max()
+    return ingredients_df
+
+
+def _frames_match(label, expected_df, actual_df, tolerance):
+    """Compare two hourly ingredient frames cell by cell, ignoring column order"""
+    if expected_df.empty or actual_df.empty:
+        matched = expected_df.empty and actual_df.empty
+        print(f"{'✅' if matched else '❌'} {label}: {'agree' if matched else 'disagree'} on an empty result")
+        return matched
     
-    print(f"\n Ingredient Usage Statistics:")
-    print(f"  - Total ingredient usage: {total_ingredient_usage:.2f} units")
-    print(f"  - Busiest hour: {busiest_hour} with {busiest_hour_usage:.2f} units")
-    print(f"  - Average hourly usage: {total_ingredient_usage / len(date_range):.2f} units")
+    if not expected_df.index.equals(actual_df.index):
+        print(f"❌ {label}: hourly index differs ({len(expected_df)} hours vs {len(actual_df)} hours)")
+        return False
     
-    # Get the top 5 ingredients by usage
-    top_ingredients = ingredients_df.sum().sort_values(ascending=False).head(5)
-    print(f"\nTop 5 ingredients by usage:")
-    for ingredient, usage in top_ingredients.items():
-        print(f"  - Ingredient {ingredient}: {usage:.2f} units")
+    if set(expected_df.columns) != set(actual_df.columns):
+        print(f"❌ {label}: ingredient columns differ: {sorted(set(expected_df.columns) ^ set(actual_df.columns))}")
+        return False
     
-    return ingredients_df
+    max_difference = (expected_df - actual_df[expected_df.columns]).abs().max().max()
+    matched = max_difference <= tolerance
+    print(f"{'✅' if matched else '❌'} {label}: largest per-cell difference {max_difference:.6f} units")
+    return matched
+
+
+def compare_ingredient_engines(start_date=None, end_date=None, tolerance=1e-6):
+    """
+    Check that the SQL, vectorized and Python loop engines produce the same hourly ingredient needs.
+    
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+    tolerance : float, optional
+        Largest absolute per-cell difference still treated as equal
+        
+    Returns:
+    --------
+    bool
+        True if every engine agrees with the Python loop on the hourly index,
+        ingredient columns and values
+    """
+    # Pin the window once so all engines see exactly the same orders
+    if end_date is None:
+        end_date = datetime.datetime.now()
+    if start_date is None:
+        start_date = end_date - datetime.timedelta(days=90)
+    
+    python_df = _calculate_hourly_needs_python(start_date, end_date, vectorized=False)
+    vectorized_df = _calculate_hourly_needs_python(start_date, end_date, vectorized=True)
+    sql_df = fetch_hourly_ingredient_usage(start_date, end_date)
+    
+    if sql_df is None:
+        print("❌ SQL engine failed; nothing to compare.")
+        return False
+    
+    vectorized_matched = _frames_match("Vectorized vs Python", python_df, vectorized_df, tolerance)
+    sql_matched = _frames_match("SQL vs Python", python_df, sql_df, tolerance)
+    return vectorized_matched and sql_matched
 
 
 if __name__ == "__main__":
@@ -101,6 +216,8 @@ if __name__ == "__main__":
     parser.add_argument('--start', type=str, help='Start date in YYYY-MM-DD format')
     parser.add_argument('--end', type=str, help='End date in YYYY-MM-DD format')
     parser.add_argument('--save', action='store_true', help='Save results to CSV file')
+    parser.add_argument('--engine', choices=['incremental', 'sql', 'vectorized', 'python'], default='sql', help='Update the cached usage store (incremental), aggregate in Postgres (sql), with the recipe matrix (vectorized) or with the per-order loop (python) (default: sql)')
+    parser.add_argument('--check-parity', action='store_true', help='Run every engine and verify they produce the same results')
     
     args = parser.parse_args()
     
@@ -122,8 +239,11 @@ if __name__ == "__main__":
     print(f"Calculating hourly ingredient needs from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     print("-" * 60 + "\n")
     
+    if args.check_parity:
+        sys.exit(0 if compare_ingredient_engines(start_date, end_date) else 1)
+    
     # Calculate the hourly ingredient needs
-    ingredients_df = calculate_ingredient_needs(start_date, end_date)
+    ingredients_df = calculate_ingredient_needs(start_date, end_date, engine=args.engine)
     
     if not ingredients_df.empty:
         # Print the first few rows
@@ -1,10 +1,20 @@
 import psycopg2
 import os
+from contextlib import contextmanager
+from psycopg2 import pool as pg_pool
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Connection pool sizing, overridable from the .env file
+POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 5))
+
+# Process-wide pool and the pid that created it (forked workers must not reuse the parent's sockets)
+_pool = None
+_pool_pid = None
+
 
 def connect_to_db():
     """Connect to the PostgreSQL database server"""
@@ -23,6 +33,116 @@ def connect_to_db():
             conn.close()
         return None
 
+
+def get_pool(min_size=None, max_size=None):
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Parameters:
+    -----------
+    min_size : int, optional
+        Connections opened up front. Defaults to DB_POOL_MIN_SIZE (1).
+    max_size : int, optional
+        Upper bound on open connections. Defaults to DB_POOL_MAX_SIZE (5).
+
+    Returns:
+    --------
+    psycopg2.pool.ThreadedConnectionPool or None
+        The shared pool, or None if it could not be created.
+    """
+    global _pool, _pool_pid
+
+    # A pool inherited through fork shares sockets with the parent, so start fresh
+    if _pool is not None and _pool_pid != os.getpid():
+        _pool = None
+
+    if _pool is not None and not _pool.closed:
+        return _pool
+
+    min_size = POOL_MIN_SIZE if min_size is None else min_size
+    max_size = POOL_MAX_SIZE if max_size is None else max_size
+
+    try:
+        print(f'Creating PostgreSQL connection pool (min={min_size}, max={max_size})...')
+        _pool = pg_pool.ThreadedConnectionPool(min_size, max_size, os.getenv('DATABASE_URL'))
+        _pool_pid = os.getpid()
+        return _pool
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error: {error}")
+        _pool = None
+        return None
+
+
+def _is_connection_healthy(conn):
+    """Check that a pooled connection is still usable with a cheap round trip"""
+    if conn.closed:
+        return False
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+        cursor.close()
+        conn.rollback()
+        return True
+    except (Exception, psycopg2.DatabaseError):
+        return False
+
+
+@contextmanager
+def pooled_connection(health_check=True):
+    """
+    Borrow a connection from the process-wide pool for the duration of a with-block.
+
+    The connection is handed back to the pool when the block exits; any transaction
+    left open is rolled back by the pool, so callers must commit their own work.
+    Connections that fail the health check are discarded and replaced.
+
+    Parameters:
+    -----------
+    health_check : bool, optional
+        Ping the connection with SELECT 1 before handing it out (default: True)
+
+    Yields:
+    -------
+    psycopg2.extensions.connection or None
+        A live connection, or None if the pool is unavailable.
+    """
+    db_pool = get_pool()
+    if db_pool is None:
+        yield None
+        return
+
+    conn = None
+    try:
+        conn = db_pool.getconn()
+        if health_check and not _is_connection_healthy(conn):
+            print('Discarding stale pooled connection...')
+            db_pool.putconn(conn, close=True)
+            conn = db_pool.getconn()
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error: {error}")
+        if conn is not None:
+            db_pool.putconn(conn, close=True)
+        yield None
+        return
+
+    try:
+        yield conn
+    finally:
+        if not db_pool.closed:
+            db_pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_pool():
+    """Close every connection held by the process-wide pool"""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid() and not _pool.closed:
+        _pool.closeall()
+        print("Connection pool closed.")
+    _pool = None
+    _pool_pid = None
+
+
 if __name__ == "__main__":
     # Test the connection
     conn = connect_to_db()
@@ -35,4 +155,4 @@ if __name__ == "__main__":
         conn.close()
         print("Database connection closed.")
     else:
-        print("Failed to connect to the database.")
\ No newline at end of file
+        print("Failed to connect to the database.")
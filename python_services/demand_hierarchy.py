@@ -0,0 +1,125 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Levels demand can be forecast at before it is split down to menu items
+HIERARCHY_LEVELS = ('menu-item', 'category', 'total')
+
+# SARIMAX models and fit times for demand series live apart from the ingredient ones,
+# so neither run evicts or overwrites the other's entries
+DEMAND_MODEL_STORE_PATH = os.getenv(
+    'DEMAND_MODEL_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'sarimax_demand_models.json')
+)
+DEMAND_RUNTIME_STORE_PATH = os.getenv(
+    'DEMAND_RUNTIME_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'fit_runtimes_demand.json')
+)
+
+# Recent days used to split a category or total forecast between its menu items
+SHARE_WINDOW_DAYS = 28
+
+
+def demand_groups(menu_item_ids, level, categories=None):
+    """
+    Assign every menu item to the demand series it is forecast with.
+
+    Parameters:
+    -----------
+    menu_item_ids : array-like
+        Menu item ids
+    level : str
+        'menu-item' (one series per item), 'category' (one per menu category)
+        or 'total' (a single series for all items)
+    categories : dict, optional
+        {menuitemid: category}, required for level='category'
+
+    Returns:
+    --------
+    list
+        Series label of each menu item, e.g. 'menuitem:12', 'category:Meals' or 'total'
+    """
+    if level == 'menu-item':
+        return [f"menuitem:{int(item)}" for item in menu_item_ids]
+    if level == 'category':
+        categories = categories or {}
+        return [f"category:{categories.get(int(item)) or 'Uncategorized'}" for item in menu_item_ids]
+    if level == 'total':
+        return ['total'] * len(menu_item_ids)
+    raise ValueError(f"Unknown hierarchy level: {level}")
+
+
+def aggregate_demand(item_demand, groups):
+    """Sum menu item demand columns into one column per demand series"""
+    return item_demand.T.groupby(np.asarray(groups), sort=True).sum().T
+
+
+def split_matrix(item_demand, groups, window_days=SHARE_WINDOW_DAYS):
+    """
+    Shares that split each demand series back into its menu items.
+
+    Each item gets its share of its series' demand over the last window_days of
+    history (the whole history if the window is empty, an even split if the
+    series has no demand at all), so every column of the result sums to 1.
+
+    Parameters:
+    -----------
+    item_demand : pandas.DataFrame
+        Historical demand indexed by timestamp, one column per menu item
+    groups : list
+        Series label of each menu item column (see demand_groups)
+    window_days : int, optional
+        Recent days the shares are measured over (default: SHARE_WINDOW_DAYS)
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Series labels x menu items share matrix
+    """
+    labels = sorted(set(groups))
+    group_positions = np.searchsorted(labels, groups)
+    membership = np.zeros((len(labels), len(groups)))
+    membership[group_positions, np.arange(len(groups))] = 1.0
+
+    recent = item_demand[item_demand.index >= item_demand.index.max() - pd.Timedelta(days=window_days)]
+    totals = recent.sum().to_numpy(dtype=float)
+    if totals.sum() <= 0:
+        totals = item_demand.sum().to_numpy(dtype=float)
+
+    weights = membership * totals
+    group_totals = weights.sum(axis=1, keepdims=True)
+    group_sizes = membership.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(group_totals > 0, weights / group_totals, membership / group_sizes)
+
+    return pd.DataFrame(shares, index=labels, columns=item_demand.columns)
+
+
+def ingredient_needs_from_demand(demand_forecast, shares, recipes):
+    """
+    Turn forecast demand series into ingredient needs through the recipe matrix.
+
+    Parameters:
+    -----------
+    demand_forecast : pandas.DataFrame
+        Forecast indexed by timestamp, one column per demand series
+    shares : pandas.DataFrame
+        Series x menu item split matrix from split_matrix, with menu items in
+        the same order as the recipe matrix rows
+    recipes : dict
+        Recipe store from recipe_store.get_recipe_matrix
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Ingredient needs indexed like demand_forecast, one column per ingredient id
+    """
+    # (periods x series) @ (series x items) -> periods x items
+    item_forecast = demand_forecast[shares.index].to_numpy(dtype=float) @ shares.to_numpy()
+    # (periods x items) @ (items x ingredients) -> periods x ingredients
+    needs = np.asarray((recipes['matrix'].T @ item_forecast.T).T, dtype=float)
+    return pd.DataFrame(
+        needs,
+        index=demand_forecast.index,
+        columns=pd.Index(recipes['ingredient_ids'], dtype=np.int64)
+    )
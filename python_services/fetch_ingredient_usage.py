@@ -0,0 +1,129 @@
+import datetime
+import pandas as pd
+from db_utils import pooled_connection
+
+# Hourly ingredient usage aggregated inside Postgres, so only the compact
+# hour x ingredient cube crosses the wire instead of every order item
+HOURLY_INGREDIENT_USAGE_QUERY = """
+SELECT
+    date_trunc('hour', o.ordertimestamp) AS hour,
+    mii.ingredientid,
+    SUM(mii.quantity) AS quantity
+FROM
+    orders o
+JOIN
+    orderitems oi ON o.orderid = oi.orderid
+JOIN
+    menuitemingredients mii ON oi.menuitemid = mii.menuitemid
+WHERE
+    o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+GROUP BY
+    1, 2
+ORDER BY
+    1, 2
+"""
+
+# Window bounds and item counts, matching the rows fetch_historical_orders would return
+ORDER_WINDOW_QUERY = """
+SELECT
+    MIN(o.ordertimestamp),
+    MAX(o.ordertimestamp),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE oi.menuitemid IN (SELECT menuitemid FROM menuitemingredients))
+FROM
+    orders o
+JOIN
+    orderitems oi ON o.orderid = oi.orderid
+JOIN
+    menuitems mi ON oi.menuitemid = mi.menuitemid
+WHERE
+    o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+"""
+
+# Every ingredient used by some recipe gets a column, even with no usage in the window
+RECIPE_INGREDIENTS_QUERY = """
+SELECT DISTINCT mii.ingredientid
+FROM menuitemingredients mii
+JOIN menuitems m ON mii.menuitemid = m.menuitemid
+JOIN ingredients i ON mii.ingredientid = i.ingredientid
+ORDER BY mii.ingredientid
+"""
+
+
+def fetch_hourly_ingredient_usage(start_date=None, end_date=None):
+    """
+    Fetch hourly ingredient usage with the order-to-recipe join pushed down to Postgres.
+
+    Produces the same hourly frame as the Python path in calculate_ingredient_needs
+    (hourly rows from the first to one past the last order hour, one column per
+    recipe ingredient id) without pulling individual order items into Python.
+
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        DataFrame indexed by hourly timestamps with ingredient id columns.
+        Empty if there are no orders or recipes in the range, None if the
+        query failed so callers can fall back to the Python path.
+    """
+    # Calculate the date range if not provided
+    if end_date is None:
+        end_date = datetime.datetime.now()
+    if start_date is None:
+        start_date = end_date - datetime.timedelta(days=90)
+
+    with pooled_connection() as conn:
+        if conn is None:
+            print("❌ Failed to connect to the database.")
+            return None
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(ORDER_WINDOW_QUERY, (start_date, end_date))
+            first_order, last_order, order_items, matched_items = cursor.fetchone()
+
+            if not order_items:
+                print("❌ No orders found in the requested range.")
+                return pd.DataFrame()
+
+            cursor.execute(RECIPE_INGREDIENTS_QUERY)
+            ingredient_ids = [row[0] for row in cursor.fetchall()]
+
+            if not ingredient_ids:
+                print("❌ No menu item ingredients found.")
+                return pd.DataFrame()
+
+            print(f"Executing hourly ingredient aggregation for {order_items} order items...")
+            cursor.execute(HOURLY_INGREDIENT_USAGE_QUERY, (start_date, end_date))
+            usage_rows = cursor.fetchall()
+            print(f"✅ Retrieved {len(usage_rows)} hour/ingredient totals "
+                  f"(processed {matched_items} orders, skipped {order_items - matched_items} orders)")
+        except Exception as e:
+            print(f"❌ Error aggregating ingredient usage: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    # Same hourly grid as the Python path: first order hour through one past the last
+    start_time = first_order.replace(minute=0, second=0, microsecond=0)
+    end_time = last_order.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+    date_range = pd.date_range(start=start_time, end=end_time, freq='h')
+
+    if not usage_rows:
+        return pd.DataFrame(0.0, index=date_range, columns=ingredient_ids)
+
+    usage = pd.DataFrame(usage_rows, columns=['hour', 'ingredientid', 'quantity'])
+    usage['quantity'] = usage['quantity'].astype(float)
+    ingredients_df = usage.pivot_table(index='hour', columns='ingredientid', values='quantity', aggfunc='sum')
+    ingredients_df = ingredients_df.reindex(index=date_range, columns=ingredient_ids, fill_value=0.0)
+    ingredients_df = ingredients_df.fillna(0.0).astype(float)
+    ingredients_df.index.name = None
+    ingredients_df.columns.name = None
+
+    return ingredients_df
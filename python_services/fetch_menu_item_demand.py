@@ -0,0 +1,125 @@
+import datetime
+import pandas as pd
+from db_utils import pooled_connection
+
+# Hourly order item counts per menu item, aggregated inside Postgres. Only menu
+# items with a recipe are counted, matching HOURLY_INGREDIENT_USAGE_QUERY
+HOURLY_MENU_ITEM_DEMAND_QUERY = """
+SELECT
+    date_trunc('hour', o.ordertimestamp) AS hour,
+    oi.menuitemid,
+    COUNT(*) AS items
+FROM
+    orders o
+JOIN
+    orderitems oi ON o.orderid = oi.orderid
+WHERE
+    o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+    AND oi.menuitemid IN (SELECT menuitemid FROM menuitemingredients)
+GROUP BY
+    1, 2
+ORDER BY
+    1, 2
+"""
+
+ORDER_HOURS_QUERY = """
+SELECT MIN(ordertimestamp), MAX(ordertimestamp)
+FROM orders o
+JOIN orderitems oi ON o.orderid = oi.orderid
+WHERE o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+"""
+
+MENU_ITEM_CATEGORIES_QUERY = "SELECT menuitemid, category::text FROM menuitems ORDER BY menuitemid"
+
+
+def fetch_hourly_menu_item_demand(menu_item_ids, start_date=None, end_date=None):
+    """
+    Fetch hourly demand per menu item, counted in Postgres.
+
+    Uses the same hourly grid as fetch_hourly_ingredient_usage (first order hour
+    through one past the last), so multiplying the result by the recipe matrix
+    gives the hourly ingredient usage frame.
+
+    Parameters:
+    -----------
+    menu_item_ids : array-like
+        Menu item ids to return as columns, in order (e.g. the recipe store's menu_item_ids)
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        Order item counts indexed by hourly timestamps with one float column per
+        menu item id. Empty if there are no orders in the range, None if the query failed.
+    """
+    if end_date is None:
+        end_date = datetime.datetime.now()
+    if start_date is None:
+        start_date = end_date - datetime.timedelta(days=90)
+
+    with pooled_connection() as conn:
+        if conn is None:
+            print("❌ Failed to connect to the database.")
+            return None
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(ORDER_HOURS_QUERY, (start_date, end_date))
+            first_order, last_order = cursor.fetchone()
+            if first_order is None:
+                print("❌ No orders found in the requested range.")
+                return pd.DataFrame()
+
+            cursor.execute(HOURLY_MENU_ITEM_DEMAND_QUERY, (start_date, end_date))
+            demand_rows = cursor.fetchall()
+            print(f"✅ Retrieved {len(demand_rows)} hour/menu item totals")
+        except Exception as e:
+            print(f"❌ Error aggregating menu item demand: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    start_time = first_order.replace(minute=0, second=0, microsecond=0)
+    end_time = last_order.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+    date_range = pd.date_range(start=start_time, end=end_time, freq='h')
+    columns = [int(menu_item_id) for menu_item_id in menu_item_ids]
+
+    if not demand_rows:
+        return pd.DataFrame(0.0, index=date_range, columns=columns)
+
+    demand = pd.DataFrame(demand_rows, columns=['hour', 'menuitemid', 'items'])
+    demand_df = demand.pivot_table(index='hour', columns='menuitemid', values='items', aggfunc='sum')
+    demand_df = demand_df.reindex(index=date_range, columns=columns, fill_value=0.0)
+    demand_df = demand_df.fillna(0.0).astype(float)
+    demand_df.index.name = None
+    demand_df.columns.name = None
+
+    return demand_df
+
+
+def fetch_menu_item_categories():
+    """
+    Fetch the menu category of every menu item.
+
+    Returns:
+    --------
+    dict or None
+        {menuitemid: category}, or None if the query failed
+    """
+    with pooled_connection() as conn:
+        if conn is None:
+            print("❌ Failed to connect to the database.")
+            return None
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(MENU_ITEM_CATEGORIES_QUERY)
+            return {menu_item_id: category for menu_item_id, category in cursor.fetchall()}
+        except Exception as e:
+            print(f"❌ Error fetching menu item categories: {e}")
+            return None
+        finally:
+            cursor.close()
@@ -1,7 +1,124 @@
 import datetime
-import psycopg2
+import io
+import pandas as pd
 from psycopg2.extras import RealDictCursor
-from db_utils import connect_to_db
+from db_utils import pooled_connection
+
+# Rows pulled from the server-side cursor per network round trip when streaming
+DEFAULT_ITERSIZE = 5000
+
+# SQL query to get order data with menu items
+HISTORICAL_ORDERS_QUERY = """
+SELECT 
+    o.orderid, 
+    o.ordertimestamp, 
+    oi.orderitemid,
+    oi.menuitemid, 
+    oi.served,
+    oi.servedtimestamp,
+    oi.customizationdetail,
+    oi.returned,
+    mi.name as menuitemname,
+    mi.price as menuitemprice
+FROM 
+    orders o
+JOIN 
+    orderitems oi ON o.orderid = oi.orderid
+JOIN 
+    menuitems mi ON oi.menuitemid = mi.menuitemid
+WHERE 
+    o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+ORDER BY 
+    o.ordertimestamp ASC
+"""
+
+# Columns available to the columnar fetch, mapped to their SQL expressions.
+# Timestamps are converted to the session time zone so they parse as naive datetime64.
+COLUMNAR_COLUMNS = {
+    'orderid': 'o.orderid',
+    'ordertimestamp': "o.ordertimestamp AT TIME ZONE current_setting('TimeZone')",
+    'orderitemid': 'oi.orderitemid',
+    'menuitemid': 'oi.menuitemid',
+    'menuitemname': 'mi.name',
+    'served': 'COALESCE(oi.served, FALSE)',
+    'returned': 'COALESCE(oi.returned, FALSE)',
+    # Seconds east of UTC of each timestamp in the session time zone
+    'utcoffset': 'EXTRACT(TIMEZONE FROM o.ordertimestamp)::integer',
+}
+
+# The columns the ingredient pipeline actually reads
+DEFAULT_COLUMNAR_COLUMNS = ('ordertimestamp', 'menuitemid', 'served', 'returned')
+
+# pandas dtypes used to parse the columnar result
+_COLUMNAR_DTYPES = {
+    'orderid': 'int32',
+    'orderitemid': 'int32',
+    'menuitemid': 'int32',
+    'menuitemname': 'str',
+    'served': 'bool',
+    'returned': 'bool',
+    'utcoffset': 'int32',
+}
+
+# Columns converted to categoricals after parsing
+_CATEGORICAL_COLUMNS = ('menuitemid', 'menuitemname')
+
+
+def _resolve_date_range(start_date, end_date):
+    """Fill in the default 90-day window for any missing end of the date range"""
+    if end_date is None:
+        end_date = datetime.datetime.now()
+    if start_date is None:
+        start_date = end_date - datetime.timedelta(days=90)
+    return start_date, end_date
+
+
+def stream_historical_orders(start_date=None, end_date=None, itersize=DEFAULT_ITERSIZE, batch_size=None):
+    """
+    Stream historical orders through a named, server-side cursor.
+    
+    Only `itersize` rows are held in memory at a time, so long windows can be
+    processed without materialising every order item as a list of dicts.
+    
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+    itersize : int, optional
+        Number of rows fetched from the server per round trip (default: 5000)
+    batch_size : int, optional
+        If given, yield lists of up to this many rows instead of single rows
+        
+    Yields:
+    -------
+    dict or list
+        One order dictionary at a time (same keys as fetch_historical_orders),
+        or a list of them when batch_size is set, in orderTimestamp order.
+    """
+    start_date, end_date = _resolve_date_range(start_date, end_date)
+    
+    with pooled_connection() as conn:
+        if conn is None:
+            print("Failed to connect to the database.")
+            return
+        
+        # A named cursor keeps the result set on the server until we ask for it
+        cursor = conn.cursor(name='historical_orders_stream', cursor_factory=RealDictCursor)
+        cursor.itersize = itersize
+        try:
+            cursor.execute(HISTORICAL_ORDERS_QUERY, (start_date, end_date))
+            if batch_size:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    yield batch
+            else:
+                yield from cursor
+        finally:
+            cursor.close()
 
 
 def fetch_historical_orders(start_date=None, end_date=None):
@@ -21,53 +138,11 @@ def fetch_historical_orders(start_date=None, end_date=None):
         List of order dictionaries containing orderID, orderTimestamp, menuItemID, 
         quantity, and menuItemName, ordered chronologically by orderTimestamp.
     """
-    # Connect to the database
-    print("Connecting to the database...")
-    conn = connect_to_db()
-    if conn is None:
-        print("Failed to connect to the database.")
-        return []
-    print("Database connection established")
-        
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Calculate the date range if not provided
-    if end_date is None:
-        end_date = datetime.datetime.now()
-    if start_date is None:
-        start_date = end_date - datetime.timedelta(days=90)
-    
-    # SQL query to get order data with menu items
-    query = """
-    SELECT 
-        o.orderid, 
-        o.ordertimestamp, 
-        oi.orderitemid,
-        oi.menuitemid, 
-        oi.served,
-        oi.servedtimestamp,
-        oi.customizationdetail,
-        oi.returned,
-        mi.name as menuitemname,
-        mi.price as menuitemprice
-    FROM 
-        orders o
-    JOIN 
-        orderitems oi ON o.orderid = oi.orderid
-    JOIN 
-        menuitems mi ON oi.menuitemid = mi.menuitemid
-    WHERE 
-        o.ordertimestamp >= %s AND o.ordertimestamp <= %s
-    ORDER BY 
-        o.ordertimestamp ASC
-    """
+    start_date, end_date = _resolve_date_range(start_date, end_date)
     
     try:
         print(f"Executing query for orders between {start_date.strftime('%Y-%m-%d %H:%M:%S')} and {end_date.strftime('%Y-%m-%d %H:%M:%S')}...")
-        cursor.execute(query, (start_date, end_date))
-        
-        print("Query executed successfully. Fetching results...")
-        orders = cursor.fetchall()
+        orders = list(stream_historical_orders(start_date, end_date))
         
         # Add debug statement to print column names
         if orders:
@@ -77,46 +152,168 @@ def fetch_historical_orders(start_date=None, end_date=None):
         
         # Show order statistics if we have orders
         if orders:
-            # Get some statistics
-            # Count unique orders
-            unique_order_ids = set(order['orderid'] for order in orders)
-            # Count unique menu items
-            unique_menu_items = set(order['menuitemname'] for order in orders)
-            
-            print(f" Statistics:")
-            print(f"  - Unique orders: {len(unique_order_ids)}")
-            print(f"  - Unique menu items: {len(unique_menu_items)}")
-            print(f"  - Served items: {sum(1 for order in orders if order['served'])}")
-            print(f"  - Returned items: {sum(1 for order in orders if order['returned'])}")
-            print(f"  - Items with customizations: {sum(1 for order in orders if order['customizationdetail'])}")
-            print(f"  - Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-            
-            # Show sample of first few orders
-            print("\n📋 Sample of retrieved orders:")
-            for i, order in enumerate(orders[:5]):  # Show first 5 orders
-                order_time = order['ordertimestamp'].strftime('%Y-%m-%d %H:%M:%S')
-                customization = order['customizationdetail'] if order['customizationdetail'] else "No customization"
-                served_status = "✓ Served" if order['served'] else "✗ Not served"
-                returned_status = "⚠️ Returned" if order['returned'] else ""
-                
-                print(f"  {i+1}. Order #{order['orderid']} at {order_time}: " 
-                      f"Item: {order['menuitemname']} (ID: {order['orderitemid']}) - "
-                      f"{served_status} {returned_status}")
-                print(f"     Customization: {customization}")
-                
-            if len(orders) > 5:
-                print(f"  ... and {len(orders) - 5} more items")
+            _print_order_statistics(orders, start_date, end_date)
         
         return orders
     except Exception as e:
         print(f" Error fetching historical orders: {e}")
         return []
-    finally:
-        cursor.close()
-        conn.close()
-        print("Database connection closed.")
 
 
+def fetch_historical_orders_columnar(start_date=None, end_date=None, columns=DEFAULT_COLUMNAR_COLUMNS, as_arrays=False,
+                                     aware=False):
+    """
+    Fetch only the requested order columns in columnar form.
+    
+    The rows are copied out of Postgres as CSV and parsed by pandas in one pass,
+    so no per-row Python dict is ever built.
+    
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+    columns : sequence of str, optional
+        Columns to return, any of COLUMNAR_COLUMNS
+        (default: ordertimestamp, menuitemid, served, returned)
+    as_arrays : bool, optional
+        Return a dict of NumPy arrays instead of a DataFrame (default: False)
+    aware : bool, optional
+        Return ordertimestamp tz-aware, with the same fixed UTC offset psycopg2
+        gives the row fetchers (UTC if the window spans several offsets) (default: False)
+        
+    Returns:
+    --------
+    pandas.DataFrame or dict
+        One column per requested name, ordered by orderTimestamp. Timestamps are
+        naive datetime64 values in the database session time zone unless aware
+        is set, item ids and names are categoricals and served/returned are booleans.
+    """
+    columns = list(columns)
+    requested = columns
+    if aware and 'ordertimestamp' in columns and 'utcoffset' not in columns:
+        columns = columns + ['utcoffset']
+    unknown = [col for col in columns if col not in COLUMNAR_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown order columns requested: {unknown}")
+    
+    start_date, end_date = _resolve_date_range(start_date, end_date)
+    
+    select_list = ",\n        ".join(f"{COLUMNAR_COLUMNS[col]} AS {col}" for col in columns)
+    menu_join = "JOIN menuitems mi ON oi.menuitemid = mi.menuitemid" if 'menuitemname' in columns else ""
+    query = f"""
+    SELECT
+        {select_list}
+    FROM
+        orders o
+    JOIN
+        orderitems oi ON o.orderid = oi.orderid
+    {menu_join}
+    WHERE
+        o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+    ORDER BY
+        o.ordertimestamp ASC
+    """
+    
+    buffer = io.StringIO()
+    with pooled_connection() as conn:
+        if conn is None:
+            print("Failed to connect to the database.")
+            return _empty_columnar_result(requested, as_arrays)
+        
+        cursor = conn.cursor()
+        try:
+            print(f"Copying {', '.join(columns)} for orders between {start_date.strftime('%Y-%m-%d %H:%M:%S')} and {end_date.strftime('%Y-%m-%d %H:%M:%S')}...")
+            bound_query = cursor.mogrify(query, (start_date, end_date)).decode()
+            cursor.copy_expert(f"COPY ({bound_query}) TO STDOUT WITH (FORMAT csv)", buffer)
+        except Exception as e:
+            print(f" Error fetching historical orders: {e}")
+            return _empty_columnar_result(requested, as_arrays)
+        finally:
+            cursor.close()
+    
+    if buffer.tell() == 0:
+        print("✅ Successfully retrieved 0 order items")
+        return _empty_columnar_result(requested, as_arrays)
+    
+    buffer.seek(0)
+    frame = pd.read_csv(
+        buffer,
+        header=None,
+        names=columns,
+        dtype={col: _COLUMNAR_DTYPES[col] for col in columns if col in _COLUMNAR_DTYPES},
+        true_values=['t'],
+        false_values=['f'],
+    )
+    if 'ordertimestamp' in frame.columns:
+        frame['ordertimestamp'] = pd.to_datetime(frame['ordertimestamp'], format='ISO8601')
+        if aware:
+            frame['ordertimestamp'] = _localize_timestamps(frame['ordertimestamp'], frame['utcoffset'])
+    frame = frame[requested]
+    for col in _CATEGORICAL_COLUMNS:
+        if col in frame.columns:
+            frame[col] = frame[col].astype('category')
+    
+    print(f"✅ Successfully retrieved {len(frame)} order items")
+    
+    if as_arrays:
+        return {col: frame[col].to_numpy() for col in requested}
+    return frame
+
+
+def _localize_timestamps(local_times, offsets):
+    """Turn naive session-time timestamps plus their UTC offsets in seconds into tz-aware ones"""
+    utc_times = (local_times - pd.to_timedelta(offsets, unit='s')).dt.tz_localize('UTC')
+    unique_offsets = offsets.unique()
+    if len(unique_offsets) != 1:
+        return utc_times
+    return utc_times.dt.tz_convert(datetime.timezone(datetime.timedelta(seconds=int(unique_offsets[0]))))
+
+
+def _empty_columnar_result(columns, as_arrays):
+    """Build an empty columnar result with the same shape as a real one"""
+    frame = pd.DataFrame({col: pd.Series(dtype=_COLUMNAR_DTYPES.get(col, 'datetime64[ns]')) for col in columns})
+    for col in _CATEGORICAL_COLUMNS:
+        if col in frame.columns:
+            frame[col] = frame[col].astype('category')
+    if as_arrays:
+        return {col: frame[col].to_numpy() for col in columns}
+    return frame
+
+
+def _print_order_statistics(orders, start_date, end_date):
+    """Print summary statistics and a small sample of the retrieved order items"""
+    # Get some statistics
+    # Count unique orders
+    unique_order_ids = set(order['orderid'] for order in orders)
+    # Count unique menu items
+    unique_menu_items = set(order['menuitemname'] for order in orders)
+    
+    print(f" Statistics:")
+    print(f"  - Unique orders: {len(unique_order_ids)}")
+    print(f"  - Unique menu items: {len(unique_menu_items)}")
+    print(f"  - Served items: {sum(1 for order in orders if order['served'])}")
+    print(f"  - Returned items: {sum(1 for order in orders if order['returned'])}")
+    print(f"  - Items with customizations: {sum(1 for order in orders if order['customizationdetail'])}")
+    print(f"  - Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+    
+    # Show sample of first few orders
+    print("\n📋 Sample of retrieved orders:")
+    for i, order in enumerate(orders[:5]):  # Show first 5 orders
+        order_time = order['ordertimestamp'].strftime('%Y-%m-%d %H:%M:%S')
+        customization = order['customizationdetail'] if order['customizationdetail'] else "No customization"
+        served_status = "✓ Served" if order['served'] else "✗ Not served"
+        returned_status = "⚠️ Returned" if order['returned'] else ""
+        
+        print(f"  {i+1}. Order #{order['orderid']} at {order_time}: " 
+              f"Item: {order['menuitemname']} (ID: {order['orderitemid']}) - "
+              f"{served_status} {returned_status}")
+        print(f"     Customization: {customization}")
+        
+    if len(orders) > 5:
+        print(f"  ... and {len(orders) - 5} more items")
+
 if __name__ == "__main__":
     # Example usage
     print("=" * 60)
@@ -131,6 +328,8 @@ if __name__ == "__main__":
     parser.add_argument('--days', type=int, default=90, help='Number of days to look back (default: 90)')
     parser.add_argument('--start', type=str, help='Start date in YYYY-MM-DD format')
     parser.add_argument('--end', type=str, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--stream', action='store_true', help='Stream rows through a server-side cursor instead of loading them all')
+    parser.add_argument('--itersize', type=int, default=DEFAULT_ITERSIZE, help=f'Rows per round trip when streaming (default: {DEFAULT_ITERSIZE})')
     
     args = parser.parse_args()
     
@@ -153,12 +352,20 @@ if __name__ == "__main__":
     print("-" * 60 + "\n")
     
     # Fetch the orders
-    orders = fetch_historical_orders(start_date, end_date)
+    if args.stream:
+        # Count rows batch by batch so only one batch is ever held in memory
+        order_count = 0
+        for batch in stream_historical_orders(start_date, end_date, itersize=args.itersize, batch_size=args.itersize):
+            order_count += len(batch)
+            print(f"  Streamed {order_count} order items so far...")
+    else:
+        orders = fetch_historical_orders(start_date, end_date)
+        order_count = len(orders)
     
     # Final summary
     print("\n" + "=" * 60)
-    if orders:
-        print(f"✅ Operation complete. Retrieved {len(orders)} order items.")
+    if order_count:
+        print(f"✅ Operation complete. Retrieved {order_count} order items.")
     else:
         print("⚠️ No orders found in the specified date range")
     print("=" * 60)
\ No newline at end of file
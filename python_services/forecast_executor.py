@@ -0,0 +1,155 @@
+import contextlib
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+class FitTimeout(BaseException):
+    """
+    Raised inside a worker when a task runs past its time budget.
+
+    Derives from BaseException so the broad `except Exception` handlers around
+    model fitting (ours and statsmodels') cannot swallow it.
+    """
+
+
+# History frames attached by _init_worker, looked up by name in worker processes
+_shared_frames = {}
+
+
+def _publish_frame(frame, directory, name):
+    """Write a frame's values to a .npy file that workers can memory-map"""
+    path = os.path.join(directory, f"{name}.npy")
+    np.save(path, frame.to_numpy(dtype=float))
+    return {'path': path, 'index': frame.index, 'columns': list(frame.columns)}
+
+
+def _init_worker(published):
+    """Pool initializer: memory-map every published history frame once per worker"""
+    for name, spec in published.items():
+        values = np.load(spec['path'], mmap_mode='r')
+        _shared_frames[name] = pd.DataFrame(values, index=spec['index'], columns=spec['columns'], copy=False)
+
+
+def get_shared_frame(name):
+    """
+    Return a history frame published by forecast_executor.
+
+    Parameters:
+    -----------
+    name : str
+        Key the frame was published under (e.g. 'daily' or 'hourly')
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Read-only frame backed by a memory-mapped array
+    """
+    return _shared_frames[name]
+
+
+def _raise_fit_timeout(signum, frame):
+    raise FitTimeout()
+
+
+@contextlib.contextmanager
+def time_budget(seconds):
+    """
+    Raise FitTimeout in this process if the block runs longer than seconds.
+
+    Uses a SIGALRM interval timer, so it only takes effect in the main thread of
+    a process on platforms that have one (worker processes on Linux and macOS);
+    elsewhere, or when seconds is None or <= 0, the block runs unbounded.
+    A fit stuck inside a single C call is interrupted when that call returns;
+    the run deadline in imap_until_deadline covers the rest.
+
+    Parameters:
+    -----------
+    seconds : float or None
+        Wall-clock budget for the block
+    """
+    if not seconds or seconds <= 0 or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    try:
+        previous = signal.signal(signal.SIGALRM, _raise_fit_timeout)
+    except ValueError:  # not the main thread
+        yield
+        return
+
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def imap_until_deadline(pool, func, tasks, deadline=None, chunksize=1):
+    """
+    Yield results in completion order until every task is done or the deadline passes.
+
+    Results stream in through Pool.imap_unordered, so one slow task never holds back
+    the others. Once the deadline passes, iteration stops; the caller must fill in the
+    missing results and leave the executor, which terminates any task still running.
+
+    Parameters:
+    -----------
+    pool : multiprocessing.pool.Pool
+        Pool from forecast_executor
+    func : callable
+        Task function
+    tasks : list
+        Task arguments
+    deadline : float, optional
+        time.monotonic() value after which to stop waiting (default: wait for all)
+    chunksize : int, optional
+        Tasks handed to a worker at a time (default: 1, so results arrive as soon as possible)
+
+    Yields:
+    -------
+    object
+        Each task's return value, in completion order
+    """
+    results = pool.imap_unordered(func, tasks, chunksize=chunksize)
+    for _ in range(len(tasks)):
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            yield results.next(timeout=timeout)
+        except multiprocessing.TimeoutError:
+            return
+
+
+@contextlib.contextmanager
+def forecast_executor(frames, processes=None):
+    """
+    Start one worker pool for a forecasting run, with history published once.
+
+    Each frame is written to a temporary .npy file and memory-mapped by every worker
+    when it starts, so tasks only need to carry an ingredient key instead of a
+    pickled copy of the whole history.
+
+    Parameters:
+    -----------
+    frames : dict
+        Mapping of names to history DataFrames, read in workers with get_shared_frame
+    processes : int, optional
+        Number of worker processes (default: multiprocessing default)
+
+    Yields:
+    -------
+    multiprocessing.pool.Pool
+        Pool whose workers can read every published frame
+    """
+    directory = tempfile.mkdtemp(prefix='forecast_history_')
+    try:
+        published = {name: _publish_frame(frame, directory, name) for name, frame in frames.items()}
+        with multiprocessing.Pool(processes=processes, initializer=_init_worker, initargs=(published,)) as pool:
+            yield pool
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
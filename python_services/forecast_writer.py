@@ -0,0 +1,206 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+# Completed forecast runs kept after each refresh; readers only see the newest one
+FORECAST_GENERATIONS_TO_KEEP = int(os.getenv('FORECAST_GENERATIONS_TO_KEEP', '3'))
+
+START_FORECAST_RUN_QUERY = "INSERT INTO forecast_runs DEFAULT VALUES RETURNING runid"
+
+COMPLETE_FORECAST_RUN_QUERY = "UPDATE forecast_runs SET completedat = CURRENT_TIMESTAMP WHERE runid = %s"
+
+# A run that failed part-way; its forecasts go with it through ON DELETE CASCADE
+ABANDON_FORECAST_RUN_QUERY = "DELETE FROM forecast_runs WHERE runid = %s AND completedat IS NULL"
+
+# Older runs outside the newest completed generations, including abandoned ones;
+# their forecasts go with them through ON DELETE CASCADE
+PRUNE_FORECAST_RUNS_QUERY = """
+DELETE FROM forecast_runs
+WHERE runid < %(run_id)s
+  AND runid NOT IN (
+      SELECT runid
+      FROM forecast_runs
+      WHERE completedat IS NOT NULL
+      ORDER BY runid DESC
+      LIMIT %(keep)s
+  )
+"""
+
+# Forecasts written before runs were versioned
+PRUNE_UNVERSIONED_FORECASTS_QUERY = "DELETE FROM forecasts WHERE runid IS NULL"
+
+# One statement for the whole batch. Rows are inserted in ordinal order, so the
+# generated ids ascend in the same order as the rows that were passed in.
+BULK_FORECAST_INSERT_QUERY = """
+INSERT INTO forecasts (recommendation, recommendationfor, createdat, runid)
+SELECT v.recommendation, v.recommendationfor, v.createdat, v.runid::integer
+FROM (VALUES %s) AS v(ordinal, recommendation, recommendationfor, createdat, runid)
+ORDER BY v.ordinal
+RETURNING forecastid
+"""
+
+
+def start_forecast_run(conn):
+    """
+    Open a new forecast generation.
+
+    Forecasts written under the returned run id stay invisible to readers
+    until complete_forecast_run is called.
+
+    Parameters:
+    -----------
+    conn : psycopg2.extensions.connection
+        Database connection object
+
+    Returns:
+    --------
+    int or None
+        New run id, or None if the run could not be created
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(START_FORECAST_RUN_QUERY)
+        run_id = cursor.fetchone()[0]
+        conn.commit()
+        print(f"✅ Started forecast run {run_id}")
+        return run_id
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error starting forecast run: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def complete_forecast_run(conn, run_id, keep=FORECAST_GENERATIONS_TO_KEEP):
+    """
+    Publish a forecast run and prune older generations in the same transaction.
+
+    Forecast rows written without committing (commit=False in the writers) are
+    committed together with the publish, or rolled back with it.
+
+    Parameters:
+    -----------
+    conn : psycopg2.extensions.connection
+        Database connection object
+    run_id : int
+        Run returned by start_forecast_run
+    keep : int, optional
+        Completed runs to keep, including this one (default: FORECAST_GENERATIONS_TO_KEEP)
+
+    Returns:
+    --------
+    bool
+        True if the run was published, False otherwise
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(COMPLETE_FORECAST_RUN_QUERY, (run_id,))
+        cursor.execute(PRUNE_FORECAST_RUNS_QUERY, {'run_id': run_id, 'keep': max(1, keep)})
+        pruned_runs = cursor.rowcount
+        cursor.execute(PRUNE_UNVERSIONED_FORECASTS_QUERY)
+        conn.commit()
+        print(f"✅ Published forecast run {run_id} (pruned {pruned_runs} older runs)")
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error publishing forecast run {run_id}: {e}")
+        return False
+    finally:
+        cursor.close()
+
+
+def abandon_forecast_run(conn, run_id):
+    """
+    Roll back anything left in the open transaction and delete an unpublished run.
+
+    The previous completed run stays the one readers see.
+
+    Parameters:
+    -----------
+    conn : psycopg2.extensions.connection
+        Database connection object
+    run_id : int
+        Run returned by start_forecast_run
+    """
+    conn.rollback()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(ABANDON_FORECAST_RUN_QUERY, (run_id,))
+        conn.commit()
+        print(f"⚠️ Abandoned forecast run {run_id}; the previous run stays live")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error abandoning forecast run {run_id}: {e}")
+    finally:
+        cursor.close()
+
+
+def daily_prep_rows(daily_df, after_date):
+    """
+    Build one forecasts row per future day from the daily needs matrix.
+
+    Parameters:
+    -----------
+    daily_df : pandas.DataFrame
+        Daily ingredient needs indexed by date, one column per ingredient
+    after_date : datetime.date
+        Only days strictly after this date are kept
+
+    Returns:
+    --------
+    list
+        [(recommendation JSON, date), ...] in index order, skipping days
+        without any positive quantity
+    """
+    if daily_df.empty:
+        return []
+
+    dates = pd.DatetimeIndex(daily_df.index).date
+    values = daily_df.to_numpy(dtype=float)
+
+    # Positive, non-NaN cells on future days, found in one pass over the matrix
+    future = dates > after_date
+    positive = np.nan_to_num(values, nan=0.0) > 0
+    keep = future & positive.any(axis=1)
+
+    columns = [str(col) for col in daily_df.columns]
+    rows = []
+    for row in np.flatnonzero(keep):
+        cells = np.flatnonzero(positive[row])
+        daily_prep = {columns[col]: float(values[row, col]) for col in cells}
+        rows.append((json.dumps(daily_prep), dates[row]))
+    return rows
+
+
+def insert_forecasts(cursor, rows, created_at, run_id=None):
+    """
+    Insert forecast rows in a single round trip.
+
+    Parameters:
+    -----------
+    cursor : psycopg2.extensions.cursor
+        Cursor on an open transaction (the caller commits)
+    rows : list
+        [(recommendation, recommendationfor), ...]
+    created_at : datetime.datetime
+        createdat value shared by every row
+    run_id : int, optional
+        Forecast run the rows belong to (see start_forecast_run)
+
+    Returns:
+    --------
+    list
+        Generated forecast ids, in the same order as rows
+    """
+    if not rows:
+        return []
+
+    values = [
+        (ordinal, recommendation, target, created_at, run_id)
+        for ordinal, (recommendation, target) in enumerate(rows)
+    ]
+    result = execute_values(cursor, BULK_FORECAST_INSERT_QUERY, values, page_size=len(values), fetch=True)
+    return sorted(forecast_id for (forecast_id,) in result)
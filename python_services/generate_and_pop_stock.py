@@ -1,7 +1,10 @@
+import argparse
+import io
 import random
 import datetime
 import sys
 import os
+import time
 from datetime import timedelta
 from decimal import Decimal
 
@@ -10,6 +13,7 @@ from python_services.db_utils import connect_to_db
 
 NUM_STOCK_ENTRIES = 200  # Number of stock entries to generate
 BATCH_SIZE = 50  # How many records to insert in a single transaction
+COPY_CHUNK_SIZE = 100000  # Rows generated and streamed per COPY in copy mode
 
 # Create a date range for received timestamps
 START_DATE = datetime.datetime.now() - timedelta(days=90)  # 90 days ago
@@ -99,6 +103,169 @@ def random_date_between(start_date, end_date):
     random_seconds = random.randrange(86400)  # Seconds in a day
     return start_date + timedelta(days=random_days, seconds=random_seconds)
 
+def _ingredient_arrays(ingredients):
+    """Column arrays of the ingredient fields the generator samples from, with the same defaults as the row path"""
+    import numpy as np
+    
+    ids, thresholds, costs, shelf_min, shelf_max = [], [], [], [], []
+    
+    for ingredient in ingredients:
+        try:
+            threshold_quantity = int(ingredient[2]) if len(ingredient) > 2 and ingredient[2] is not None else 30
+        except (TypeError, ValueError):
+            threshold_quantity = 30
+        try:
+            cost_per_unit = float(ingredient[3]) if len(ingredient) > 3 and ingredient[3] is not None else 0.1
+        except (TypeError, ValueError):
+            cost_per_unit = 0.1
+        try:
+            shelf_life_days = int(ingredient[4]) if len(ingredient) > 4 and ingredient[4] is not None else None
+        except (TypeError, ValueError):
+            shelf_life_days = None
+        category = ingredient[5] if len(ingredient) > 5 and ingredient[5] is not None else 'default'
+        
+        # Skip ingredients with zero threshold or cost
+        if threshold_quantity == 0 or cost_per_unit == 0:
+            continue
+        
+        # A fixed shelf life is a one-value range; otherwise use the category range
+        if shelf_life_days and shelf_life_days > 0:
+            min_days = max_days = shelf_life_days
+        else:
+            min_days, max_days = SHELF_LIFE.get(category, SHELF_LIFE['default'])
+        
+        ids.append(ingredient[0])
+        thresholds.append(threshold_quantity)
+        costs.append(cost_per_unit)
+        shelf_min.append(min_days)
+        shelf_max.append(max_days)
+    
+    return {
+        'ingredientid': np.asarray(ids, dtype=np.int64),
+        'threshold': np.asarray(thresholds, dtype=np.int64),
+        'cost_per_unit': np.asarray(costs, dtype=float),
+        'shelf_min': np.asarray(shelf_min, dtype=np.int64),
+        'shelf_max': np.asarray(shelf_max, dtype=np.int64),
+    }
+
+
+def generate_stock_frame(ingredient_arrays, num_entries, rng, start_date, end_date, now=None):
+    """
+    Sample a chunk of stock rows with NumPy, one array per column.
+    
+    Follows the same distributions as generate_and_insert_stock: uniform
+    ingredient and received time, category or fixed shelf life, low/medium/high
+    quantity bands around the threshold and +/-10% cost variation.
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        Columns in stock table order: ingredientid, quantity, expirationdate,
+        receivedtimestamp, cost, isexpired
+    """
+    import numpy as np
+    import pandas as pd
+    
+    now = now or datetime.datetime.now()
+    picks = rng.integers(0, len(ingredient_arrays['ingredientid']), size=num_entries)
+    threshold = ingredient_arrays['threshold'][picks]
+    
+    # Received timestamps within the window, to the second
+    window_days = max(1, (end_date - start_date).days)
+    offsets = rng.integers(0, window_days, size=num_entries) * 86400 + rng.integers(0, 86400, size=num_entries)
+    received = np.datetime64(start_date, 's') + offsets.astype('timedelta64[s]')
+    
+    # Shelf life in whole days, inclusive of both ends of the range
+    shelf_days = rng.integers(ingredient_arrays['shelf_min'][picks], ingredient_arrays['shelf_max'][picks] + 1)
+    expiration = received + (shelf_days * 86400).astype('timedelta64[s]')
+    
+    # Quantity band: below (20%), around (30%) or above (50%) the threshold
+    band = rng.choice(3, size=num_entries, p=[0.2, 0.3, 0.5])
+    low = np.select(
+        [band == 0, band == 1],
+        [np.ones_like(threshold), np.maximum(1, (threshold * 0.8).astype(np.int64))],
+        np.maximum(2, (threshold * 1.2).astype(np.int64))
+    )
+    high = np.select(
+        [band == 0, band == 1],
+        [np.maximum(1, (threshold * 0.8).astype(np.int64)), np.maximum(2, (threshold * 1.2).astype(np.int64))],
+        np.maximum(3, (threshold * 2).astype(np.int64))
+    )
+    quantity = rng.integers(low, high + 1)
+    
+    cost = np.round(ingredient_arrays['cost_per_unit'][picks] * quantity * rng.uniform(0.9, 1.1, size=num_entries), 2)
+    
+    return pd.DataFrame({
+        'ingredientid': ingredient_arrays['ingredientid'][picks],
+        'quantity': quantity,
+        'expirationdate': expiration,
+        'receivedtimestamp': received,
+        'cost': cost,
+        'isexpired': expiration < np.datetime64(now, 's'),
+    })
+
+
+def copy_stock(conn, ingredients, num_entries, seed=None, days=90, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Generate stock entries with NumPy and stream them to Postgres with COPY.
+    
+    Each chunk is sampled, written to an in-memory CSV buffer and loaded with
+    one COPY FROM STDIN, then committed, so memory stays bounded for millions
+    of rows. The same seed and chunk size always produce the same rows.
+    
+    Returns:
+    --------
+    int
+        Number of rows inserted (rows from already committed chunks are kept on error)
+    """
+    # NumPy and pandas are only needed here, so the default insert mode starts without them
+    import numpy as np
+    
+    arrays = _ingredient_arrays(ingredients)
+    if not len(arrays['ingredientid']):
+        print("No ingredients available. Cannot generate stock data.")
+        return 0
+    
+    rng = np.random.default_rng(seed)
+    end_date = datetime.datetime.now()
+    start_date = end_date - timedelta(days=days)
+    records_inserted = 0
+    started = time.perf_counter()
+    
+    cursor = conn.cursor()
+    try:
+        while records_inserted < num_entries:
+            chunk = generate_stock_frame(arrays, min(chunk_size, num_entries - records_inserted), rng, start_date, end_date, end_date)
+            
+            # ISO strings from NumPy are much cheaper than letting to_csv format datetimes
+            for column in ('expirationdate', 'receivedtimestamp'):
+                chunk[column] = np.datetime_as_string(chunk[column].to_numpy(), unit='s')
+            
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, header=False, index=False, float_format='%.2f')
+            buffer.seek(0)
+            cursor.copy_expert("""
+                COPY stock (
+                    ingredientid, quantity, expirationdate, receivedtimestamp,
+                    cost, isexpired
+                ) FROM STDIN WITH (FORMAT csv)
+            """, buffer)
+            conn.commit()
+            
+            records_inserted += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"Copied {len(chunk)} records, total: {records_inserted}/{num_entries} ({records_inserted / elapsed:,.0f} rows/s)")
+        
+        return records_inserted
+    
+    except Exception as e:
+        print(f"Error copying stock data: {e}")
+        conn.rollback()
+        return records_inserted
+    finally:
+        cursor.close()
+
+
 def generate_and_insert_stock(conn, ingredients, num_entries):
     """Generate stock entries and insert them into the database"""
     if not ingredients:
@@ -243,11 +410,27 @@ def check_table_exists(conn):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic stock entries')
+    parser.add_argument('--rows', type=int, default=NUM_STOCK_ENTRIES, help=f'Number of stock entries to generate (default: {NUM_STOCK_ENTRIES})')
+    parser.add_argument('--mode', choices=['insert', 'copy'], default='insert', help='Insert rows in batches of 50 (insert) or stream NumPy-sampled chunks with COPY (copy) (default: insert)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+    parser.add_argument('--days', type=int, default=90, help='Days of received-stock history to spread entries over (default: 90)')
+    parser.add_argument('--chunk-size', type=int, default=COPY_CHUNK_SIZE, help=f'Rows per COPY chunk in copy mode (default: {COPY_CHUNK_SIZE})')
+    parser.add_argument('--auto-confirm', action='store_true', help='Skip confirmation prompts')
+    parser.add_argument('--clear-data', action='store_true', help='Clear existing stock before generating')
+    args = parser.parse_args()
+    
+    global START_DATE
+    START_DATE = END_DATE - timedelta(days=args.days)
+    if args.seed is not None:
+        random.seed(args.seed)
+    
     # Ask for confirmation
-    confirmation = input(f"This will generate {NUM_STOCK_ENTRIES} stock entries. Continue? (y/n): ").lower()
-    if confirmation != 'y':
-        print("Operation cancelled.")
-        return
+    if not args.auto_confirm:
+        confirmation = input(f"This will generate {args.rows} stock entries. Continue? (y/n): ").lower()
+        if confirmation != 'y':
+            print("Operation cancelled.")
+            return
     
     # Connect to database
     conn = connect_to_db()
@@ -262,8 +445,10 @@ def main():
             return
         
         # Ask user if they want to clear existing data
-        clear_data = input("Do you want to clear existing data from the stock table? (y/n): ").lower()
-        if clear_data == 'y':
+        clear_data = args.clear_data
+        if not clear_data and not args.auto_confirm:
+            clear_data = input("Do you want to clear existing data from the stock table? (y/n): ").lower() == 'y'
+        if clear_data:
             if not clear_existing_data(conn):
                 print("Failed to clear existing data. Exiting.")
                 return
@@ -276,9 +461,14 @@ def main():
             return
             
         # Generate and insert stock data
-        records_inserted = generate_and_insert_stock(
-            conn, ingredients, NUM_STOCK_ENTRIES
-        )
+        if args.mode == 'copy':
+            records_inserted = copy_stock(
+                conn, ingredients, args.rows, seed=args.seed, days=args.days, chunk_size=args.chunk_size
+            )
+        else:
+            records_inserted = generate_and_insert_stock(
+                conn, ingredients, args.rows
+            )
         
         if records_inserted > 0:
             print(f"Successfully generated and inserted {records_inserted} stock entries.")
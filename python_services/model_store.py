@@ -0,0 +1,161 @@
+import datetime
+import hashlib
+import json
+import os
+import numpy as np
+
+# Fitted SARIMAX orders and parameters, reused between nightly runs
+MODEL_STORE_PATH = os.getenv(
+    'MODEL_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'sarimax_models.json')
+)
+
+# Re-run the full order search after this many days, even if warm starts keep working
+MODEL_MAX_AGE_DAYS = 7
+
+# Forget models that have not been used for this many days
+MODEL_EVICT_AFTER_DAYS = 30
+
+
+def series_fingerprint(series):
+    """
+    Hash a daily usage series so a cached model can tell whether its data changed.
+
+    Parameters:
+    -----------
+    series : pandas.Series
+        Daily usage series for one ingredient
+
+    Returns:
+    --------
+    str
+        Hex digest covering the date range and every value
+    """
+    digest = hashlib.sha1()
+    if len(series):
+        digest.update(str(series.index[0]).encode())
+        digest.update(str(series.index[-1]).encode())
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+
+def load_model_store(path=MODEL_STORE_PATH):
+    """
+    Load cached SARIMAX models.
+
+    Returns:
+    --------
+    dict
+        Mapping of str(ingredient) to model entries (see make_model_entry);
+        empty if there is no readable store
+    """
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read SARIMAX model store {path}: {e}")
+        return {}
+
+
+def save_model_store(store, path=MODEL_STORE_PATH):
+    """Write the model store to disk atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def make_model_entry(order, seasonal_order, params, fingerprint, searched_on, used_on=None, aic_scores=None):
+    """
+    Build a JSON-serialisable model entry.
+
+    Parameters:
+    -----------
+    order : tuple
+        (p, d, q)
+    seasonal_order : tuple
+        (P, D, Q, s)
+    params : array-like
+        Fitted parameter vector, in the order statsmodels reports it
+    fingerprint : str
+        series_fingerprint of the data the parameters were fitted on
+    searched_on : str
+        ISO date of the last full order search for this ingredient
+    used_on : str, optional
+        ISO date the entry was last used (default: today)
+    aic_scores : dict, optional
+        Order search scores measured on the data behind fingerprint (see order_search.py)
+
+    Returns:
+    --------
+    dict
+        Model entry
+    """
+    return {
+        'order': [int(value) for value in order],
+        'seasonal_order': [int(value) for value in seasonal_order],
+        'params': [float(value) for value in np.asarray(params)],
+        'fingerprint': fingerprint,
+        'searched_on': searched_on,
+        'used_on': used_on or datetime.date.today().isoformat(),
+        'aic_cache': {'fingerprint': fingerprint, 'scores': dict(aic_scores or {})},
+    }
+
+
+def cached_aic_scores(entry, fingerprint):
+    """Return the entry's order search scores if they were measured on the same data"""
+    if not entry:
+        return {}
+    aic_cache = entry.get('aic_cache') or {}
+    if aic_cache.get('fingerprint') != fingerprint:
+        return {}
+    return dict(aic_cache.get('scores') or {})
+
+
+def is_search_due(entry, today=None):
+    """Check whether a cached model is too old to skip the order search"""
+    today = today or datetime.date.today()
+    try:
+        searched_on = datetime.date.fromisoformat(entry['searched_on'])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return (today - searched_on).days >= MODEL_MAX_AGE_DAYS
+
+
+def evict_stale_models(store, active_ingredients, today=None):
+    """
+    Remove models for ingredients that are no longer on the menu or no longer used.
+
+    Parameters:
+    -----------
+    store : dict
+        Model store to prune in place
+    active_ingredients : iterable
+        Ingredients present in the current recipe data
+    today : datetime.date, optional
+        Reference date for the age check (default: today)
+
+    Returns:
+    --------
+    int
+        Number of entries removed
+    """
+    today = today or datetime.date.today()
+    active = {str(ingredient) for ingredient in active_ingredients}
+    evicted = []
+
+    for key, entry in store.items():
+        try:
+            idle_days = (today - datetime.date.fromisoformat(entry.get('used_on', ''))).days
+        except (TypeError, ValueError):
+            idle_days = MODEL_EVICT_AFTER_DAYS
+        if key not in active or idle_days >= MODEL_EVICT_AFTER_DAYS:
+            evicted.append(key)
+
+    for key in evicted:
+        del store[key]
+    return len(evicted)
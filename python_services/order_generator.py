@@ -0,0 +1,175 @@
+import io
+import numpy as np
+import pandas as pd
+
+# Relative order volume for each hour of the day (0 = midnight): quiet overnight,
+# a breakfast bump, a lunch peak and a larger dinner peak
+HOURLY_DEMAND = np.array([
+    0.2, 0.1, 0.1, 0.1, 0.1, 0.3,
+    0.8, 1.5, 2.0, 1.6, 1.8, 4.0,
+    6.0, 4.5, 2.2, 1.8, 2.5, 4.5,
+    6.5, 5.5, 3.5, 2.2, 1.2, 0.5,
+])
+
+# Relative order volume for each day of the week (Monday = 0)
+WEEKLY_DEMAND = np.array([0.85, 0.9, 0.95, 1.0, 1.25, 1.35, 1.1])
+
+# Orders per day before the weekly curve is applied
+DEFAULT_ORDERS_PER_DAY = 400
+
+# Menu items flagged isPopular are picked this many times as often as the rest
+POPULAR_ITEM_WEIGHT = 3.0
+
+# Items per order: 1 + Poisson(ITEMS_PER_ORDER_MEAN - 1), capped at ITEMS_PER_ORDER_MAX
+ITEMS_PER_ORDER_MEAN = 2.5
+ITEMS_PER_ORDER_MAX = 8
+
+# Minutes between an order being placed and its items being served
+PREP_MINUTES = (3, 20)
+
+# Share of served items that come back
+RETURN_RATE = 0.02
+
+# Rows generated and streamed per COPY
+COPY_CHUNK_SIZE = 100000
+
+
+def daily_order_counts(rng, start_date, days, orders_per_day=DEFAULT_ORDERS_PER_DAY):
+    """
+    Draw the number of orders placed on each day.
+
+    Parameters:
+    -----------
+    rng : numpy.random.Generator
+        Seeded generator
+    start_date : datetime.date
+        First day of the range
+    days : int
+        Number of days to generate
+    orders_per_day : float, optional
+        Average orders per day across the week (default: DEFAULT_ORDERS_PER_DAY)
+
+    Returns:
+    --------
+    tuple
+        (day start times as datetime64[s], Poisson order counts per day)
+    """
+    day_starts = np.datetime64(start_date, 'D') + np.arange(days)
+    # 1970-01-01 was a Thursday, so shift by 3 to get Monday = 0
+    weekdays = (day_starts.astype('int64') + 3) % 7
+    expected = orders_per_day * WEEKLY_DEMAND[weekdays] / WEEKLY_DEMAND.mean()
+    return day_starts.astype('datetime64[s]'), rng.poisson(expected)
+
+
+def sample_order_times(rng, day_starts, counts):
+    """
+    Place each day's orders on the clock following HOURLY_DEMAND.
+
+    Returns:
+    --------
+    numpy.ndarray
+        Order timestamps as datetime64[s], sorted so generated ids follow time
+    """
+    hours = rng.choice(24, size=int(counts.sum()), p=HOURLY_DEMAND / HOURLY_DEMAND.sum())
+    seconds = hours * 3600 + rng.integers(0, 3600, size=len(hours))
+    times = np.repeat(day_starts, counts) + seconds.astype('timedelta64[s]')
+    times.sort()
+    return times
+
+
+def sample_prep_delays(rng, size):
+    """Seconds from order to service, uniform over PREP_MINUTES"""
+    return rng.integers(PREP_MINUTES[0] * 60, PREP_MINUTES[1] * 60 + 1, size=size).astype('timedelta64[s]')
+
+
+def order_frame(rng, order_times):
+    """
+    Build rows for the orders table.
+
+    Every generated order is in the past, so it is completed one preparation
+    delay after it was placed.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        ordertimestamp, completed, completedTimeStamp columns ready for copy_frame
+    """
+    completed_times = order_times + sample_prep_delays(rng, len(order_times))
+    return pd.DataFrame({
+        'ordertimestamp': np.datetime_as_string(order_times, unit='s'),
+        'completed': True,
+        'completedTimeStamp': np.datetime_as_string(completed_times, unit='s'),
+    })
+
+
+def menu_item_weights(popular):
+    """
+    Turn isPopular flags into sampling probabilities.
+
+    Parameters:
+    -----------
+    popular : array-like
+        menuitems.isPopular for each menu item (NULL counts as not popular)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Probabilities summing to 1
+    """
+    flags = np.array([bool(flag) for flag in popular])
+    weights = np.where(flags, POPULAR_ITEM_WEIGHT, 1.0)
+    return weights / weights.sum()
+
+
+def order_item_frame(rng, order_ids, order_times, menu_item_ids, weights):
+    """
+    Build rows for the orderitems table for a block of orders.
+
+    Parameters:
+    -----------
+    rng : numpy.random.Generator
+        Seeded generator
+    order_ids : numpy.ndarray
+        Orders to fill
+    order_times : numpy.ndarray
+        Matching order timestamps as datetime64[s]
+    menu_item_ids : numpy.ndarray
+        Menu items to pick from
+    weights : numpy.ndarray
+        Probability of each menu item (see menu_item_weights)
+
+    Returns:
+    --------
+    pandas.DataFrame
+        orderid, menuitemid, served, servedtimestamp, returned columns ready for copy_frame
+    """
+    counts = np.minimum(1 + rng.poisson(ITEMS_PER_ORDER_MEAN - 1, size=len(order_ids)), ITEMS_PER_ORDER_MAX)
+    total = int(counts.sum())
+    served_times = np.repeat(order_times, counts) + sample_prep_delays(rng, total)
+    return pd.DataFrame({
+        'orderid': np.repeat(order_ids, counts),
+        'menuitemid': rng.choice(menu_item_ids, size=total, p=weights),
+        'served': True,
+        'servedtimestamp': np.datetime_as_string(served_times, unit='s'),
+        'returned': rng.random(total) < RETURN_RATE,
+    })
+
+
+def copy_frame(cursor, table, frame):
+    """
+    Load a frame into a table with one COPY FROM STDIN.
+
+    Parameters:
+    -----------
+    cursor : psycopg2.extensions.cursor
+        Cursor on an open transaction (the caller commits)
+    table : str
+        Target table; column names are taken from the frame and quoted
+    frame : pandas.DataFrame
+        Rows to load, already formatted for CSV
+    """
+    columns = ', '.join(f'"{column}"' for column in frame.columns)
+    buffer = io.StringIO()
+    frame.to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
@@ -0,0 +1,198 @@
+import itertools
+import random
+import warnings
+import numpy as np
+
+# Optimizer iterations for each rung of the successive-halving search; only the
+# best 1/SEARCH_ETA of each rung is promoted, and the last rung's fit is reused.
+# All 16 candidates are scored at their starting estimates (0 iterations), 2 go on
+# to 5 iterations and the winner to 50: about the CPU of the old 2x2 sample at 50
+# iterations plus its refit, spread over 4x as many candidates
+SEARCH_RUNGS = (0, 5, 50)
+SEARCH_ETA = 8
+
+# Candidates entering the first rung, sampled from the full grid
+SEARCH_MAX_CANDIDATES = 16
+
+# Used when no candidate could be fitted
+DEFAULT_ORDER = ((1, 0, 1), (1, 0, 1, 7))
+
+
+def load_sarimax():
+    """
+    Import statsmodels' SARIMAX on first use.
+
+    statsmodels is the slowest import in the service, so modules that only
+    sometimes fit models call this instead of importing it at module level.
+    Importing statsmodels installs "always" filters for its convergence and model
+    warnings ahead of any earlier warnings.filterwarnings('ignore'), so they are
+    silenced again here, after the import, to keep fits as quiet as before.
+    """
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    from statsmodels.tools.sm_exceptions import ModelWarning
+    warnings.filterwarnings('ignore', category=ModelWarning)
+    return SARIMAX
+
+
+def candidate_orders(max_order=1, seasonal_period=7):
+    """
+    List every (order, seasonal_order) pair in the search grid.
+
+    Parameters:
+    -----------
+    max_order : int, optional
+        Largest value tried for each of p, d, q, P, D and Q (default: 1)
+    seasonal_period : int, optional
+        Seasonal period s (default: 7, weekly seasonality on daily data)
+
+    Returns:
+    --------
+    list
+        [((p, d, q), (P, D, Q, s)), ...] with (max_order + 1) ** 6 entries
+    """
+    values = range(0, max_order + 1)
+    pdq = list(itertools.product(values, values, values))
+    seasonal_pdq = [combo + (seasonal_period,) for combo in itertools.product(values, values, values)]
+    return [(order, seasonal_order) for order in pdq for seasonal_order in seasonal_pdq]
+
+
+def order_key(order, seasonal_order):
+    """Stable string key for a candidate, used in the AIC cache"""
+    return ','.join(str(int(value)) for value in tuple(order) + tuple(seasonal_order))
+
+
+def _sample_candidates(max_candidates, preferred=None, seed=42):
+    """Seeded sample of the grid, always including the preferred order if given"""
+    candidates = candidate_orders()
+    if max_candidates is None or max_candidates >= len(candidates):
+        return candidates
+
+    rng = random.Random(seed)
+    sample = rng.sample(candidates, max_candidates)
+    if preferred is not None and preferred not in sample:
+        sample[-1] = preferred
+    return sample
+
+
+def _fit_candidate(series, order, seasonal_order, maxiter, start_params=None):
+    """Fit one candidate, returning None if statsmodels rejects it"""
+    try:
+        model = load_sarimax()(
+            series,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        fit = model.fit(start_params=start_params, disp=False, maxiter=maxiter)
+    except Exception:
+        return None
+    return fit if np.isfinite(fit.aic) else None
+
+
+def _screen_candidate(series, order, seasonal_order, maxiter, start_params=None):
+    """
+    Cheap fit for a screening rung, returning (params, aic) or None.
+
+    Only the optimizer and one filter pass for the log-likelihood are run; the
+    smoother and numerical covariance a full fit adds cost more than a few
+    optimizer steps and are not needed to rank candidates. series may be a plain
+    array, which skips statsmodels' index handling.
+    """
+    try:
+        model = load_sarimax()(
+            series,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        if maxiter > 0:
+            params = model.fit(start_params=start_params, disp=False, maxiter=maxiter, return_params=True)
+        else:
+            # A 0-iteration rung scores the model's own starting estimates as they are
+            params = model.start_params if start_params is None else np.asarray(start_params)
+        aic = -2 * model.loglike(params) + 2 * len(params)
+    except Exception:
+        return None
+    return (params, float(aic)) if np.isfinite(aic) else None
+
+
+def search_sarimax_order(series, aic_cache=None, preferred=None,
+                         max_candidates=SEARCH_MAX_CANDIDATES, rungs=SEARCH_RUNGS, eta=SEARCH_ETA):
+    """
+    Pick SARIMAX orders for a series with a successive-halving search.
+
+    Every candidate gets a cheap low-iteration screening fit; the best by AIC are
+    promoted to longer fits warm-started from their previous parameters, and the
+    winning fit from the last rung is returned so the caller does not have to refit it.
+
+    Parameters:
+    -----------
+    series : pandas.Series
+        Daily usage series
+    aic_cache : dict, optional
+        {'rung key': aic or None} scores measured earlier on this exact series
+        (see order_key); updated in place with every new score
+    preferred : tuple, optional
+        (order, seasonal_order) that must be among the candidates, e.g. last week's winner
+    max_candidates : int or None, optional
+        Candidates in the first rung (None searches the full grid)
+    rungs : tuple, optional
+        Optimizer iterations per rung
+    eta : int, optional
+        Keep the best 1/eta of each rung
+
+    Returns:
+    --------
+    tuple
+        (order, seasonal_order, fit, fits_run) where fit is the fitted results of
+        the winner at the last rung, or None if not even the default orders fit
+    """
+    aic_cache = {} if aic_cache is None else aic_cache
+    candidates = _sample_candidates(max_candidates, preferred)
+    values = np.asarray(series, dtype=float)
+    last_rung = len(rungs) - 1
+    params = {}
+    fits = {}
+    fits_run = 0
+
+    for rung, maxiter in enumerate(rungs):
+        scores = []
+        for candidate in candidates:
+            order, seasonal_order = candidate
+            key = f"{order_key(order, seasonal_order)}@{maxiter}"
+            if key in aic_cache:
+                aic = aic_cache[key]
+                params.pop(candidate, None)
+            elif rung == last_rung:
+                fit = _fit_candidate(series, order, seasonal_order, maxiter, params.get(candidate))
+                fits_run += 1
+                fits[candidate] = fit
+                aic = float(fit.aic) if fit is not None else None
+                aic_cache[key] = aic
+            else:
+                screened = _screen_candidate(values, order, seasonal_order, maxiter, params.get(candidate))
+                fits_run += 1
+                params[candidate], aic = screened if screened is not None else (None, None)
+                aic_cache[key] = aic
+
+            if aic is not None:
+                scores.append((aic, order, seasonal_order))
+
+        if not scores:
+            # Nothing could be fitted: try the default orders once at the last rung
+            candidates = [DEFAULT_ORDER]
+            break
+
+        scores.sort()
+        keep = 1 if rung == last_rung else max(1, len(scores) // eta)
+        candidates = [(order, seasonal_order) for _, order, seasonal_order in scores[:keep]]
+
+    order, seasonal_order = candidates[0]
+    fit = fits.get((order, seasonal_order))
+    if fit is None:
+        # The winner's score came from the cache: fit it once at the last rung
+        fit = _fit_candidate(series, order, seasonal_order, rungs[-1])
+        fits_run += 1
+    return order, seasonal_order, fit, fits_run
@@ -1,24 +1,251 @@
 import os
 import argparse
-from db_utils import connect_to_db
+import json
+from db_utils import pooled_connection
 from datetime import datetime
 
-def move_expired_to_waste(auto_confirm=False, verbose=False):
+# Expiration time up to which lots have already been swept, kept between nightly runs
+EXPIRY_WATERMARK_PATH = os.getenv(
+    'EXPIRY_WATERMARK_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'expiry_watermark.json')
+)
+
+# Lots that expired in (since, until]; both bounds use idx_stock_expirationdate.
+# A NULL since (first sweep) covers everything up to until.
+DUE_FOR_EXPIRY_COUNT_QUERY = """
+SELECT COUNT(*)
+FROM stock
+WHERE isexpired = FALSE
+  AND expirationdate <= %(until)s
+  AND (%(since)s::timestamptz IS NULL OR expirationdate > %(since)s::timestamptz)
+"""
+
+# Flags newly expired lots and moves what is left of them to waste in one statement
+SWEEP_EXPIRED_QUERY = """
+WITH due AS (
+    SELECT stockid, quantity
+    FROM stock
+    WHERE isexpired = FALSE
+      AND expirationdate <= %(until)s
+      AND (%(since)s::timestamptz IS NULL OR expirationdate > %(since)s::timestamptz)
+    FOR UPDATE
+),
+flagged AS (
+    UPDATE stock s
+    SET isexpired = TRUE, quantity = 0
+    FROM due d
+    WHERE s.stockid = d.stockid
+    RETURNING s.stockid, s.ingredientid, d.quantity
+),
+moved AS (
+    INSERT INTO waste (stockid, reason, quantity)
+    SELECT stockid, 'Expired'::wastereason, quantity
+    FROM flagged
+    WHERE quantity > 0
+    RETURNING wasteid, stockid
+)
+SELECT m.wasteid, i.ingredientname, f.quantity
+FROM flagged f
+JOIN ingredients i ON f.ingredientid = i.ingredientid
+LEFT JOIN moved m ON m.stockid = f.stockid
+ORDER BY f.stockid
+"""
+
+EXPIRED_COUNT_QUERY = """
+SELECT COUNT(*)
+FROM stock s
+JOIN ingredients i ON s.ingredientid = i.ingredientid
+WHERE s.isexpired = TRUE AND s.quantity > 0
+"""
+
+# Moves up to %(limit)s expired lots (NULL = all) in one statement: the lots are
+# locked, copied into waste and zeroed in stock. Lots locked by another session
+# are skipped and picked up by the next batch or run.
+MOVE_EXPIRED_QUERY = """
+WITH expired AS (
+    SELECT s.stockid, s.quantity, i.ingredientname
+    FROM stock s
+    JOIN ingredients i ON s.ingredientid = i.ingredientid
+    WHERE s.isexpired = TRUE AND s.quantity > 0
+    ORDER BY s.stockid
+    LIMIT %(limit)s
+    FOR UPDATE OF s SKIP LOCKED
+),
+moved AS (
+    INSERT INTO waste (stockid, reason, quantity)
+    SELECT stockid, 'Expired'::wastereason, quantity
+    FROM expired
+    RETURNING wasteid, stockid, quantity
+),
+emptied AS (
+    UPDATE stock s
+    SET quantity = 0
+    FROM expired e
+    WHERE s.stockid = e.stockid
+)
+SELECT m.wasteid, e.ingredientname, m.quantity
+FROM moved m
+JOIN expired e ON e.stockid = m.stockid
+ORDER BY m.wasteid
+"""
+
+def load_expiry_watermark(path=EXPIRY_WATERMARK_PATH):
+    """Return the expiration time covered by the last sweep, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['swept_until'])
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Could not read expiry watermark {path}: {e}")
+        return None
+
+
+def save_expiry_watermark(swept_until, path=EXPIRY_WATERMARK_PATH):
+    """Write the sweep watermark to disk atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'swept_until': swept_until.isoformat()}, f)
+    os.replace(temp_path, path)
+
+
+def move_expired_to_waste(auto_confirm=False, verbose=False, mode='set', batch_size=None, sweep=False, full_sweep=False):
     """
     Move expired ingredients from stock to the waste table.
     
     Args:
         auto_confirm (bool): Skip confirmation prompts if True
         verbose (bool): Display detailed output if True
+        mode (str): 'set' moves lots with one statement per batch, 'row' uses
+            an INSERT and UPDATE per lot
+        batch_size (int): In 'set' mode, move at most this many lots per
+            transaction (None moves everything at once)
+        sweep (bool): First flag lots whose expiration date passed since the
+            last sweep and move them to waste
+        full_sweep (bool): Ignore the sweep watermark and check every lot
     """
     print("==== Moving Expired Ingredients to Waste ====")
     
-    # Get database connection
-    conn = connect_to_db()
-    if not conn:
-        print("Failed to connect to database. Please check connection settings.")
-        return
+    # Borrow a connection from the shared pool
+    with pooled_connection() as conn:
+        if not conn:
+            print("Failed to connect to database. Please check connection settings.")
+            return
+        if sweep or full_sweep:
+            _sweep_newly_expired(conn, auto_confirm, verbose, full_sweep)
+        if mode == 'row':
+            _move_expired_items(conn, auto_confirm, verbose)
+        else:
+            _move_expired_items_set_based(conn, auto_confirm, verbose, batch_size)
+
+
+def _sweep_newly_expired(conn, auto_confirm, verbose, full_sweep=False):
+    """Flag lots that expired since the last sweep and move them to waste in one transaction"""
+    cursor = conn.cursor()
+    since = None if full_sweep else load_expiry_watermark()
     
+    try:
+        # Use the database clock so the watermark matches expirationdate values
+        cursor.execute("SELECT CURRENT_TIMESTAMP")
+        until = cursor.fetchone()[0]
+        params = {'since': since, 'until': until}
+        
+        print(f"Sweeping lots that expired {'since ' + str(since) if since else 'before now'}...")
+        cursor.execute(DUE_FOR_EXPIRY_COUNT_QUERY, params)
+        due_count = cursor.fetchone()[0]
+        
+        if not due_count:
+            conn.commit()
+            save_expiry_watermark(until)
+            print("No newly expired lots found.")
+            return
+        
+        if not auto_confirm:
+            confirmation = input(f"Mark {due_count} newly expired lots as expired and move them to waste? (y/n): ").lower()
+            if confirmation != 'y':
+                conn.rollback()
+                print("Sweep cancelled.")
+                return
+        
+        cursor.execute(SWEEP_EXPIRED_QUERY, params)
+        swept = cursor.fetchall()
+        conn.commit()
+        save_expiry_watermark(until)
+        
+        moved = [row for row in swept if row[0] is not None]
+        print(f"Marked {len(swept)} lots as expired and moved {len(moved)} of them to waste.")
+        if verbose:
+            for waste_id, ingredient_name, quantity in moved:
+                print(f"Waste ID: {waste_id}, Item: {ingredient_name}, Quantity: {quantity}")
+    
+    except Exception as e:
+        conn.rollback()
+        print(f"Error sweeping expired stock: {e}")
+    finally:
+        cursor.close()
+
+
+def _move_expired_items_set_based(conn, auto_confirm, verbose, batch_size=None):
+    """Move expired stock with one data-modifying statement per batch, committing each batch"""
+    cursor = conn.cursor()
+    waste_items = []
+    
+    try:
+        cursor.execute(EXPIRED_COUNT_QUERY)
+        expired_count = cursor.fetchone()[0]
+        conn.commit()
+        
+        if not expired_count:
+            print("No expired ingredients found in stock.")
+            return
+        
+        print(f"Found {expired_count} expired items in stock.")
+        
+        # If not auto-confirmed, ask for confirmation
+        if not auto_confirm:
+            confirmation = input(f"Move {expired_count} expired items to waste? (y/n): ").lower()
+            if confirmation != 'y':
+                print("Operation cancelled.")
+                return
+        
+        # Short transactions keep row locks brief when draining a large backlog
+        while True:
+            cursor.execute(MOVE_EXPIRED_QUERY, {'limit': batch_size})
+            batch = cursor.fetchall()
+            conn.commit()
+            waste_items.extend(batch)
+            
+            if verbose:
+                for _, ingredient_name, quantity in batch:
+                    print(f"Moved {quantity} units of {ingredient_name} to waste.")
+                if batch_size:
+                    print(f"Committed batch of {len(batch)} items.")
+            
+            if not batch_size or len(batch) < batch_size:
+                break
+        
+        print(f"Successfully moved {len(waste_items)} expired items to waste.")
+        
+        # Display summary if verbose or not auto-confirm
+        if verbose or not auto_confirm:
+            print("\nWaste Record Summary:")
+            print("-" * 50)
+            for waste_id, name, qty in waste_items:
+                print(f"Waste ID: {waste_id}, Item: {name}, Quantity: {qty}")
+        
+    except Exception as e:
+        conn.rollback()
+        if waste_items:
+            print(f"Moved {len(waste_items)} expired items to waste before the error.")
+        print(f"Error moving expired items to waste: {e}")
+    finally:
+        cursor.close()
+
+
+def _move_expired_items(conn, auto_confirm, verbose):
+    """Run the expired-stock move inside a single transaction on an open connection"""
     cursor = conn.cursor()
     waste_items = []
     
@@ -88,16 +315,25 @@ def move_expired_to_waste(auto_confirm=False, verbose=False):
         print(f"Error moving expired items to waste: {e}")
     finally:
         cursor.close()
-        conn.close()
-        print("Database connection closed.")
 
 def main():
     parser = argparse.ArgumentParser(description='Move expired ingredients to waste')
     parser.add_argument('--auto-confirm', action='store_true', help='Skip confirmation prompts')
     parser.add_argument('--verbose', action='store_true', help='Display detailed output')
+    parser.add_argument('--mode', choices=['set', 'row'], default='set', help='Move all lots with one statement per batch (set) or one lot at a time (row) (default: set)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Move at most this many lots per transaction in set mode (default: all at once)')
+    parser.add_argument('--sweep', action='store_true', help='First mark lots that expired since the last sweep and move them to waste')
+    parser.add_argument('--full-sweep', action='store_true', help='Like --sweep, but check every lot instead of starting from the last sweep')
     args = parser.parse_args()
     
-    move_expired_to_waste(auto_confirm=args.auto_confirm, verbose=args.verbose)
+    move_expired_to_waste(
+        auto_confirm=args.auto_confirm,
+        verbose=args.verbose,
+        mode=args.mode,
+        batch_size=args.batch_size,
+        sweep=args.sweep,
+        full_sweep=args.full_sweep
+    )
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,34 +2,60 @@ import argparse
 import datetime
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from sklearn.metrics import mean_squared_error
 import warnings
 import json
 import multiprocessing
+import os
+import time
 from functools import partial
-import itertools
-from db_utils import connect_to_db
-from fetch_menu_ingredients import fetch_menu_items_ingredients
-from fetch_orders import fetch_historical_orders
+from db_utils import pooled_connection, close_pool
+from calculate_ingredient_needs import calculate_ingredient_needs as calculate_hourly_ingredient_needs
+from recipe_store import get_recipe_matrix
+from forecast_executor import (
+    forecast_executor, get_shared_frame, imap_until_deadline, time_budget, FitTimeout
+)
+from forecast_writer import (
+    daily_prep_rows, insert_forecasts, start_forecast_run, complete_forecast_run, abandon_forecast_run,
+    FORECAST_GENERATIONS_TO_KEEP
+)
+from model_store import (
+    MODEL_STORE_PATH, load_model_store, save_model_store, make_model_entry,
+    series_fingerprint, is_search_due, evict_stale_models, cached_aic_scores
+)
+from runtime_store import (
+    RUNTIME_STORE_PATH, load_runtime_store, save_runtime_store, record_fit_time, expected_fit_seconds, longest_first
+)
+from order_search import search_sarimax_order, load_sarimax
+from fetch_menu_item_demand import fetch_hourly_menu_item_demand, fetch_menu_item_categories
+from demand_hierarchy import (
+    DEMAND_MODEL_STORE_PATH, DEMAND_RUNTIME_STORE_PATH,
+    demand_groups, aggregate_demand, split_matrix, ingredient_needs_from_demand
+)
+from tracing import span, traced, enable_tracing, tracing_enabled, print_trace_summary
 
 # Suppress warning messages for cleaner output
 warnings.filterwarnings('ignore')
 
+# Optimizer iterations when warm-starting from a cached model's parameters
+WARM_START_MAXITER = 25
+
+# Wall-clock budget for one ingredient's SARIMAX fit; slower fits fall back to the
+# day-of-week forecast instead of holding up the run
+SARIMAX_FIT_BUDGET_SECONDS = float(os.getenv('SARIMAX_FIT_BUDGET_SECONDS', '120'))
+
+# Deadline for all SARIMAX fits of a run; ingredients still pending then use the fallback
+FORECAST_DEADLINE_SECONDS = float(os.getenv('FORECAST_DEADLINE_SECONDS', '2700'))
+
 ###################################################################################
 # PART 1: DATA COLLECTION AND PROCESSING
 ###################################################################################
 
-def calculate_ingredient_needs(start_date=None, end_date=None):
+def calculate_ingredient_needs(start_date=None, end_date=None, engine='sql'):
     """
-    Convert order data into ingredient needs broken down by hour.
+    Convert order data into ingredient needs broken down by hour and by day.
     
-    This function:
-    1. Fetches historical orders from the database
-    2. Fetches menu items and their ingredient requirements
-    3. Maps the order quantities to ingredient usage
-    4. Creates a DataFrame indexed by hourly timestamps with ingredients as columns
+    The hourly frame comes from calculate_ingredient_needs.py, which owns the
+    aggregation engines; it is resampled to daily totals here for forecasting.
     
     Parameters:
     -----------
@@ -37,6 +63,9 @@ def calculate_ingredient_needs(start_date=None, end_date=None):
         Start date for the query range. If None, defaults to 90 days ago.
     end_date : datetime.datetime, optional
         End date for the query range. If None, defaults to current time.
+    engine : str, optional
+        'incremental', 'sql', 'vectorized' or 'python'; see
+        calculate_ingredient_needs.calculate_ingredient_needs (default: 'sql')
         
     Returns:
     --------
@@ -45,86 +74,11 @@ def calculate_ingredient_needs(start_date=None, end_date=None):
         - 'hourly': DataFrame indexed by hourly timestamps
         - 'daily': DataFrame with daily aggregated data
     """
-    print("Retrieving order history...")
-    orders = fetch_historical_orders(start_date, end_date)
-    
-    if not orders:
-        print("❌ No orders found. Cannot calculate ingredient needs.")
-        return {'hourly': pd.DataFrame(), 'daily': pd.DataFrame()}
-    
-    print(f"Retrieved {len(orders)} order items.")
-    
-    print("Retrieving menu item ingredients...")
-    menu_items = fetch_menu_items_ingredients()
+    ingredients_df = calculate_hourly_ingredient_needs(start_date, end_date, engine=engine)
     
-    if not menu_items:
-        print("❌ No menu item ingredients found. Cannot calculate ingredient needs.")
+    if ingredients_df.empty:
         return {'hourly': pd.DataFrame(), 'daily': pd.DataFrame()}
     
-    print(f"Retrieved ingredients for {len(menu_items)} menu items.")
-    
-    # Get list of all unique ingredients
-    all_ingredients = set()
-    for ingredients in menu_items.values():
-        all_ingredients.update(ingredients.keys())
-    print(f"Identified {len(all_ingredients)} unique ingredients.")
-    
-    # Create timestamp range
-    # Find min and max order timestamps
-    if orders:
-        start_time = min(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0)
-        end_time = max(order['ordertimestamp'] for order in orders).replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
-    else:
-        return {'hourly': pd.DataFrame(), 'daily': pd.DataFrame()}  # Return empty DataFrame if no orders
-    
-    # Create DataFrame with hourly timestamps
-    print(f"Creating hourly ingredient needs from {start_time} to {end_time}...")
-    date_range = pd.date_range(start=start_time, end=end_time, freq='H')
-    ingredients_df = pd.DataFrame(index=date_range, columns=list(all_ingredients))
-    ingredients_df = ingredients_df.fillna(0.0)  # Fill with float 0.0 instead of integer 0
-    # Explicitly set data types to float to avoid type conversion warnings
-    ingredients_df = ingredients_df.astype(float)
-    
-    # Process each order
-    processed_orders = 0
-    skipped_orders = 0
-    
-    for order in orders:
-        # Get the hour timestamp (rounded down to the nearest hour)
-        hour_timestamp = order['ordertimestamp'].replace(minute=0, second=0, microsecond=0)
-        menu_item_name = order['menuitemname']
-        
-        # Skip if this menu item doesn't have ingredient data
-        if menu_item_name not in menu_items:
-            skipped_orders += 1
-            continue
-        
-        processed_orders += 1
-        
-        # Process each ingredient for this menu item
-        for ingredient, amount in menu_items[menu_item_name].items():
-            # Accumulate the ingredient amount needed
-            # Assume quantity is always 1 since we don't have that info in orderitems table
-            ingredients_df.at[hour_timestamp, ingredient] += amount
-    
-    print(f"Processed {processed_orders} orders, skipped {skipped_orders} orders.")
-    
-    # Calculate some statistics for informational purposes
-    total_ingredient_usage = ingredients_df.sum().sum()
-    busiest_hour = ingredients_df.sum(axis=1).idxmax()
-    busiest_hour_usage = ingredients_df.sum(axis=1).max()
-    
-    print(f"\n📊 Ingredient Usage Statistics:")
-    print(f"  - Total ingredient usage: {total_ingredient_usage:.2f} units")
-    print(f"  - Busiest hour: {busiest_hour} with {busiest_hour_usage:.2f} units")
-    print(f"  - Average hourly usage: {total_ingredient_usage / len(date_range):.2f} units")
-    
-    # Get the top 5 ingredients by usage
-    top_ingredients = ingredients_df.sum().sort_values(ascending=False).head(5)
-    print(f"\nTop 5 ingredients by usage:")
-    for ingredient, usage in top_ingredients.items():
-        print(f"  - Ingredient {ingredient}: {usage:.2f} units")
-    
     # Additional preprocessing for time series analysis
     # Resample to daily frequency for more stable forecasting
     daily_ingredients_df = ingredients_df.resample('D').sum()
@@ -136,37 +90,8 @@ def calculate_ingredient_needs(start_date=None, end_date=None):
     }
 
 
-def clear_forecast_database(conn):
-    """
-    Clear all records from the forecasts table.
-    
-    Parameters:
-    -----------
-    conn : psycopg2.extensions.connection
-        Database connection object
-        
-    Returns:
-    --------
-    bool
-        True if operation was successful, False otherwise
-    """
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("DELETE FROM forecasts")
-        deleted_count = cursor.rowcount
-        conn.commit()
-        print(f"✅ Successfully cleared {deleted_count} records from forecasts table")
-        return True
-    except Exception as e:
-        conn.rollback()
-        print(f"❌ Error clearing forecasts table: {e}")
-        return False
-    finally:
-        cursor.close()
-
-
-def store_predictions_in_db(conn, forecasts, recommendations):
+@traced()
+def store_predictions_in_db(conn, forecasts, recommendations, run_id=None, commit=True):
     """
     Store predictions in the database forecasts table.
     
@@ -178,15 +103,19 @@ def store_predictions_in_db(conn, forecasts, recommendations):
         Dictionary with forecast DataFrames or a single DataFrame
     recommendations : dict
         Dictionary with various recommendation types
+    run_id : int, optional
+        Forecast run the rows belong to (see forecast_writer.start_forecast_run)
+    commit : bool, optional
+        Commit the rows (default: True); with False they stay in the open
+        transaction for complete_forecast_run to commit
     
     Returns:
     --------
-    list
-        List of forecast IDs that were created
+    list or None
+        List of forecast IDs that were created (empty if there was nothing to
+        store), or None if the rows could not be written
     """
-    import json
-    import psycopg2
-    from datetime import datetime, timedelta
+    from datetime import datetime
     
     # Handle both new dict format and old DataFrame format
     if isinstance(forecasts, dict) and 'hourly' in forecasts:
@@ -195,77 +124,43 @@ def store_predictions_in_db(conn, forecasts, recommendations):
         forecast_data = forecasts
     else:
         print("❌ Invalid forecast data format.")
-        return []
+        return None
     
     if forecast_data.empty:
         print("❌ No forecast data to store in database.")
         return []
         
     cursor = conn.cursor()
-    forecast_ids = []
     current_time = datetime.now()
     current_date = current_time.date()
     
     try:
-        # Only store recommendations for future dates
+        # Only store recommendations for future dates, one row per day with any quantities
+        rows = []
         if 'daily_needs' in recommendations and not recommendations['daily_needs'].empty:
-            daily_df = recommendations['daily_needs']
-            
-            # Process each forecasted day separately, but only future dates
-            for date_idx in daily_df.index:
-                # Convert Timestamp to date if needed
-                if hasattr(date_idx, 'date'):
-                    date_idx_date = date_idx.date()
-                else:
-                    date_idx_date = date_idx
-                
-                # Skip past dates
-                if date_idx_date <= current_date:
-                    continue
-                    
-                # Create a dict of ingredient quantities for this day
-                daily_prep = {}
-                for col in daily_df.columns:
-                    if not pd.isna(daily_df.loc[date_idx, col]) and daily_df.loc[date_idx, col] > 0:
-                        daily_prep[str(col)] = float(daily_df.loc[date_idx, col])
-                
-                # Skip if there are no significant quantities
-                if not daily_prep:
-                    continue
-                
-                # Use the date as the recommendationfor field
-                if hasattr(date_idx, 'date'):
-                    target_date = date_idx.date()
-                else:
-                    target_date = date_idx
-                
-                # Store in database - just the ingredient quantities for clarity
-                query = """
-                INSERT INTO forecasts (recommendation, recommendationfor, createdat) 
-                VALUES (%s, %s, %s)
-                RETURNING forecastid
-                """
-                
-                cursor.execute(query, (json.dumps(daily_prep), target_date, current_time))
-                forecast_id = cursor.fetchone()[0]
-                forecast_ids.append(forecast_id)
-                print(f"✅ Stored prep recommendation for {target_date.strftime('%Y-%m-%d')} with ID: {forecast_id}")
+            rows = daily_prep_rows(recommendations['daily_needs'], current_date)
+        
+        # Store in database in a single round trip - just the ingredient quantities for clarity
+        forecast_ids = insert_forecasts(cursor, rows, current_time, run_id)
+        for (_, target_date), forecast_id in zip(rows, forecast_ids):
+            print(f"✅ Stored prep recommendation for {target_date.strftime('%Y-%m-%d')} with ID: {forecast_id}")
         
-        # Commit the transaction
-        conn.commit()
+        if commit:
+            conn.commit()
         print(f"✅ Successfully stored recommendations for future dates in database")
         return forecast_ids
         
     except Exception as e:
         conn.rollback()
         print(f"❌ Error storing forecast in database: {e}")
-        return []
+        return None
         
     finally:
         cursor.close()
 
 
-def store_traffic_recommendations(conn, traffic_recommendations):
+@traced()
+def store_traffic_recommendations(conn, traffic_recommendations, run_id=None, commit=True):
     """
     Store traffic recommendations in the database.
     
@@ -275,11 +170,17 @@ def store_traffic_recommendations(conn, traffic_recommendations):
         Database connection object
     traffic_recommendations : dict
         Dictionary of dates with text recommendations
+    run_id : int, optional
+        Forecast run the rows belong to (see forecast_writer.start_forecast_run)
+    commit : bool, optional
+        Commit the rows (default: True); with False they stay in the open
+        transaction for complete_forecast_run to commit
         
     Returns:
     --------
-    list
-        List of forecast IDs that were created
+    list or None
+        List of forecast IDs that were created (empty if there was nothing to
+        store), or None if the rows could not be written
     """
     import json
     from datetime import datetime
@@ -289,45 +190,79 @@ def store_traffic_recommendations(conn, traffic_recommendations):
         return []
         
     cursor = conn.cursor()
-    forecast_ids = []
     current_time = datetime.now()
     
     try:
-        for date, recommendation in traffic_recommendations.items():
-            query = """
-            INSERT INTO forecasts (recommendation, recommendationfor, createdat) 
-            VALUES (%s, %s, %s)
-            RETURNING forecastid
-            """
-            
-            # Package the recommendation in a JSON object for clarity
-            recommendation_data = json.dumps({
-                "type": "traffic_forecast",
-                "text_recommendation": recommendation
-            })
-            
-            cursor.execute(query, (recommendation_data, date, current_time))
-            forecast_id = cursor.fetchone()[0]
-            forecast_ids.append(forecast_id)
+        # Package each recommendation in a JSON object for clarity
+        rows = [
+            (json.dumps({"type": "traffic_forecast", "text_recommendation": recommendation}), date)
+            for date, recommendation in traffic_recommendations.items()
+        ]
+        
+        forecast_ids = insert_forecasts(cursor, rows, current_time, run_id)
+        for (_, date), forecast_id in zip(rows, forecast_ids):
             print(f"✅ Stored traffic recommendation for {date.strftime('%Y-%m-%d')} with ID: {forecast_id}")
         
-        conn.commit()
+        if commit:
+            conn.commit()
         return forecast_ids
         
     except Exception as e:
         conn.rollback()
         print(f"❌ Error storing traffic recommendations: {e}")
-        return []
+        return None
         
     finally:
         cursor.close()
 
 
+def store_forecast_run(conn, forecasts, recommendations, traffic_recommendations, keep=FORECAST_GENERATIONS_TO_KEEP):
+    """
+    Write predictions and traffic recommendations as one run and publish it atomically.
+    
+    Both writers and the publish share one transaction. If either writer fails,
+    the run is deleted unpublished and the previous run stays live. A writer with
+    nothing to store (e.g. no prep rows after today) is not a failure: the other
+    writer's rows are still published.
+    
+    Parameters:
+    -----------
+    conn : psycopg2.extensions.connection
+        Database connection object
+    forecasts, recommendations, traffic_recommendations
+        As for store_predictions_in_db and store_traffic_recommendations
+    keep : int, optional
+        Completed runs to keep, including this one (default: FORECAST_GENERATIONS_TO_KEEP)
+    
+    Returns:
+    --------
+    tuple
+        (prediction forecast ids, traffic forecast ids); both empty if the run was not published
+    """
+    # Write under a new run id; readers keep seeing the previous run until it is published
+    run_id = start_forecast_run(conn)
+    if run_id is None:
+        return [], []
+    
+    prep_ids = store_predictions_in_db(conn, forecasts, recommendations, run_id, commit=False)
+    traffic_ids = None
+    if prep_ids is not None:
+        traffic_ids = store_traffic_recommendations(conn, traffic_recommendations, run_id, commit=False)
+    
+    if traffic_ids is not None and complete_forecast_run(conn, run_id, keep=keep):
+        return prep_ids, traffic_ids
+    
+    abandon_forecast_run(conn, run_id)
+    return [], []
+
+
 ###################################################################################
 # PART 2: FORECASTING WITH SARIMAX MODELS
 ###################################################################################
 
-def forecast_future_needs(ingredients_data, future_hours=24*7):  # Default to 1 week forecast
+def forecast_future_needs(ingredients_data, future_hours=24*7, use_model_cache=True,
+                          fit_budget=SARIMAX_FIT_BUDGET_SECONDS, deadline=FORECAST_DEADLINE_SECONDS,
+                          model_store_path=MODEL_STORE_PATH, runtime_store_path=RUNTIME_STORE_PATH):  # Default to 1 week forecast
     """
     Generate ingredient forecast for future hours using SARIMAX models.
     
@@ -338,11 +273,24 @@ def forecast_future_needs(ingredients_data, future_hours=24*7):  # Default to 1
         or DataFrame with hourly data (for backward compatibility)
     future_hours : int, optional
         Number of hours to forecast (default: 1 week)
+    use_model_cache : bool, optional
+        Reuse and update fitted SARIMAX models from previous runs (default: True)
+    fit_budget : float, optional
+        Seconds one ingredient's SARIMAX fit may take before it is cancelled and
+        replaced by the fallback forecast (default: SARIMAX_FIT_BUDGET_SECONDS, 0 = no limit)
+    deadline : float, optional
+        Seconds all SARIMAX fits may take together; ingredients not finished by then
+        use the fallback forecast (default: FORECAST_DEADLINE_SECONDS, 0 = no limit)
+    model_store_path : str, optional
+        Cached SARIMAX models for these series (default: MODEL_STORE_PATH)
+    runtime_store_path : str, optional
+        Recorded fit times for these series (default: RUNTIME_STORE_PATH)
         
     Returns:
     --------
     dict
-        Dictionary with hourly and daily forecast DataFrames
+        Dictionary with hourly and daily forecast DataFrames, and under 'timed_out'
+        the ingredients whose SARIMAX fit ran out of time
     """
     # Convert old format to new format if needed
     if isinstance(ingredients_data, pd.DataFrame):
@@ -402,29 +350,81 @@ def forecast_future_needs(ingredients_data, future_hours=24*7):  # Default to 1
         hourly_forecasts = fallback_forecasts['hourly'].copy()
         daily_forecasts = fallback_forecasts['daily'].copy()
     
+    # Fitted models from previous runs, keyed by ingredient
+    model_store = load_model_store(model_store_path) if use_model_cache else {}
+    if model_store:
+        print(f"💾 Loaded {len(model_store)} cached SARIMAX models")
+    
     # Use multiprocessing to speed up model fitting
     num_cores = max(1, multiprocessing.cpu_count() - 1)  # Leave one core free
     print(f"🖥️ Using {num_cores} CPU cores for parallel processing")
     
-    # Process daily forecasts first (these are more stable)
-    with multiprocessing.Pool(processes=num_cores) as pool:
-        # Partial function with fixed parameters
-        forecast_func = partial(
-            _forecast_ingredient_daily,
-            historical_data=ingredients_data['daily'],
-            future_dates=future_daily_dates
-        )
+    # statsmodels is imported lazily; load it once here so forked workers inherit it
+    load_sarimax()
+    
+    # One worker pool per run; history is published once and memory-mapped by every
+    # worker, so tasks only carry an ingredient key and its cached model
+    with forecast_executor({'daily': ingredients_data['daily']}, processes=num_cores) as pool:
+        # Process daily forecasts first (these are more stable)
+        forecast_func = partial(_forecast_ingredient_daily_task, future_dates=future_daily_dates, fit_budget=fit_budget)
         
         # Try to model ALL valid ingredients with SARIMAX, not just a sample
         # This ensures we get predictions for as many ingredients as possible
         
-        # Map the function to the ingredients
-        results = pool.map(forecast_func, valid_ingredients)
+        # Map the function to the ingredients, handing each one its cached model.
+        # Results stream in as fits finish, so a slow ingredient only delays itself
+        tasks = [(ingredient, model_store.get(str(ingredient))) for ingredient in valid_ingredients]
+        
+        # Hand out the slowest fits first so no long fit starts last and runs on alone
+        runtime_store = load_runtime_store(runtime_store_path)
+        fit_kinds = {
+            ingredient: _expected_fit_kind(ingredients_data['daily'][ingredient], cached_model)
+            for ingredient, cached_model in tasks
+        }
+        fit_costs = expected_fit_seconds(
+            {ingredient: ingredients_data['daily'][ingredient] for ingredient in valid_ingredients},
+            fit_kinds, runtime_store
+        )
+        tasks = longest_first(tasks, fit_costs)
+        print(f"📋 Scheduling {len(tasks)} fits longest first "
+              f"(about {sum(fit_costs.values()):.2f} s of fitting, longest {max(fit_costs.values()):.2f} s)")
+        
+        deadline_at = time.monotonic() + deadline if deadline and deadline > 0 else None
+        pending = set(valid_ingredients)
+        timed_out = []
         
         # Update the forecasts DataFrame with results
-        for ingredient, forecast_values in results:
+        for ingredient, forecast_values, model_entry, over_budget, fit_seconds in imap_until_deadline(pool, forecast_func, tasks, deadline_at):
+            pending.discard(ingredient)
+            record_fit_time(runtime_store, ingredient, fit_kinds[ingredient], fit_seconds)
             if ingredient in daily_forecasts.columns:
                 daily_forecasts[ingredient] = forecast_values
+            if model_entry is not None:
+                model_store[str(ingredient)] = model_entry
+            if over_budget:
+                timed_out.append(ingredient)
+        
+        # Fits still running at the deadline are terminated with the pool
+        if pending:
+            unfinished = [ingredient for ingredient in valid_ingredients if ingredient in pending]
+            print(f"⏰ Forecast deadline of {deadline:g} s reached, using fallback forecasts for {len(unfinished)} ingredients")
+            daily_forecasts[unfinished] = _fallback_forecast_matrix(
+                ingredients_data['daily'][unfinished],
+                future_daily_dates
+            )
+            timed_out.extend(unfinished)
+        
+        save_runtime_store(runtime_store, ingredients_data['daily'].columns, runtime_store_path)
+        
+        timed_out_set = set(timed_out)
+        timed_out = [ingredient for ingredient in valid_ingredients if ingredient in timed_out_set]
+        if timed_out:
+            print(f"⏰ {len(timed_out)} ingredients ran out of time and use fallback forecasts: {', '.join(map(str, timed_out))}")
+        
+        if use_model_cache:
+            evicted = evict_stale_models(model_store, ingredients_data['daily'].columns)
+            save_model_store(model_store, model_store_path)
+            print(f"💾 Saved {len(model_store)} SARIMAX models to the model store ({evicted} evicted)")
     
     # Handle hourly forecasts for all ingredients that had successful SARIMAX daily forecasts
     ingredients_with_forecasts = [
@@ -434,47 +434,121 @@ def forecast_future_needs(ingredients_data, future_hours=24*7):  # Default to 1
     
     if ingredients_with_forecasts:
         print(f"⏱️ Generating detailed hourly forecasts for {len(ingredients_with_forecasts)} ingredients")
-        with multiprocessing.Pool(processes=num_cores) as pool:
-            # Partial function with fixed parameters
-            hourly_forecast_func = partial(
-                _forecast_ingredient_hourly,
-                historical_data=ingredients_data['hourly'],
-                daily_forecast=daily_forecasts,
-                future_dates=future_hourly_dates
-            )
-            
-            # Map the function to all ingredients with daily forecasts
-            hourly_results = pool.map(hourly_forecast_func, ingredients_with_forecasts)
-            
-            # Update the forecasts DataFrame with results
-            for ingredient, forecast_values in hourly_results:
-                if ingredient in hourly_forecasts.columns:
-                    hourly_forecasts[ingredient] = forecast_values
+        # One broadcast over all ingredients: daily totals x hour-of-day shares
+        hourly_forecasts[ingredients_with_forecasts] = _distribute_daily_to_hourly(
+            daily_forecasts[ingredients_with_forecasts],
+            ingredients_data['hourly'],
+            future_hourly_dates
+        )
     
     # Validate that we have meaningful forecasts
     # If any key ingredients have no forecast, use fallback
     top_ingredients = ingredients_data['daily'].sum().nlargest(5).index.tolist()
     
-    for ingredient in top_ingredients:
-        if hourly_forecasts[ingredient].sum() < 0.1 and ingredients_data['hourly'][ingredient].sum() > 0:
+    refilled_ingredients = [
+        ingredient for ingredient in top_ingredients
+        if hourly_forecasts[ingredient].sum() < 0.1 and ingredients_data['hourly'][ingredient].sum() > 0
+    ]
+    
+    if refilled_ingredients:
+        for ingredient in refilled_ingredients:
             print(f"⚠️ Important ingredient {ingredient} has insufficient forecast, applying fallback...")
-            # Use fallback for this ingredient
-            ingredient_fallback = _fallback_forecast_daily(ingredient, ingredients_data['daily'], future_daily_dates)
-            daily_forecasts[ingredient] = ingredient_fallback[1]
-            
-            # Distribute to hourly
-            hourly_forecasts[ingredient] = _distribute_daily_to_hourly(
-                ingredient, 
-                daily_forecasts, 
-                ingredients_data['hourly'],
-                future_hourly_dates
-            )
+        
+        # Use fallback for these ingredients
+        daily_forecasts[refilled_ingredients] = _fallback_forecast_matrix(
+            ingredients_data['daily'][refilled_ingredients],
+            future_daily_dates
+        )
+        
+        # Distribute to hourly
+        hourly_forecasts[refilled_ingredients] = _distribute_daily_to_hourly(
+            daily_forecasts[refilled_ingredients],
+            ingredients_data['hourly'],
+            future_hourly_dates
+        )
     
     print(f"✅ Successfully generated forecasts for {len(ingredients_data['hourly'].columns)} ingredients")
     
     return {
         'hourly': hourly_forecasts,
-        'daily': daily_forecasts
+        'daily': daily_forecasts,
+        'timed_out': timed_out
+    }
+
+
+def forecast_needs_from_demand(ingredients_data, future_hours=24*7, level='menu-item', start_date=None, end_date=None,
+                               use_model_cache=True, fit_budget=SARIMAX_FIT_BUDGET_SECONDS,
+                               deadline=FORECAST_DEADLINE_SECONDS):
+    """
+    Forecast menu item demand and derive ingredient needs through the recipe matrix.
+    
+    Instead of one SARIMAX model per ingredient, demand is forecast per menu item,
+    per menu category or as one total (see demand_hierarchy.py) with the same
+    machinery as forecast_future_needs. Category and total forecasts are split
+    between their menu items by recent share, and the menu item forecasts are
+    multiplied by the recipe matrix. Ingredients that share menu items therefore
+    get mutually consistent forecasts, and far fewer models are fitted.
+    
+    Parameters:
+    -----------
+    ingredients_data : dict
+        Hourly and daily historical ingredient usage (from calculate_ingredient_needs);
+        its columns are the ingredients returned
+    future_hours : int, optional
+        Number of hours to forecast (default: 1 week)
+    level : str, optional
+        'menu-item', 'category' or 'total' (default: 'menu-item')
+    start_date, end_date : datetime.datetime, optional
+        History window, the same as used for ingredients_data
+    use_model_cache, fit_budget, deadline
+        As for forecast_future_needs; demand models are cached in DEMAND_MODEL_STORE_PATH
+        
+    Returns:
+    --------
+    dict or None
+        Same structure as forecast_future_needs, or None if demand history could
+        not be read so the caller can forecast ingredients directly
+    """
+    recipes = get_recipe_matrix()
+    if recipes is None or not len(recipes['menu_item_ids']):
+        print("❌ No menu item ingredients found. Cannot forecast from menu item demand.")
+        return None
+    
+    item_demand = fetch_hourly_menu_item_demand(recipes['menu_item_ids'], start_date, end_date)
+    if item_demand is None or item_demand.empty:
+        return None
+    
+    categories = None
+    if level == 'category':
+        categories = fetch_menu_item_categories()
+        if categories is None:
+            return None
+    
+    groups = demand_groups(recipes['menu_item_ids'], level, categories)
+    demand_hourly = aggregate_demand(item_demand, groups)
+    shares = split_matrix(item_demand, groups)
+    print(f"\n🍔 Forecasting {demand_hourly.shape[1]} {level} demand series for "
+          f"{item_demand.shape[1]} menu items instead of {ingredients_data['daily'].shape[1]} ingredients")
+    
+    demand_forecasts = forecast_future_needs(
+        {'hourly': demand_hourly, 'daily': demand_hourly.resample('D').sum()},
+        future_hours, use_model_cache=use_model_cache, fit_budget=fit_budget, deadline=deadline,
+        model_store_path=DEMAND_MODEL_STORE_PATH, runtime_store_path=DEMAND_RUNTIME_STORE_PATH
+    )
+    if demand_forecasts['hourly'].empty:
+        return None
+    
+    # Demand series -> menu items -> ingredients, for hourly and daily alike
+    ingredient_columns = ingredients_data['daily'].columns
+    hourly_forecasts = ingredient_needs_from_demand(demand_forecasts['hourly'], shares, recipes)
+    daily_forecasts = ingredient_needs_from_demand(demand_forecasts['daily'], shares, recipes)
+    
+    print(f"✅ Derived forecasts for {len(ingredient_columns)} ingredients from menu item demand")
+    
+    return {
+        'hourly': hourly_forecasts.reindex(columns=ingredient_columns, fill_value=0.0),
+        'daily': daily_forecasts.reindex(columns=ingredient_columns, fill_value=0.0),
+        'timed_out': demand_forecasts.get('timed_out', [])
     }
 
 
@@ -538,80 +612,14 @@ def _has_pattern(series):
     return True
 
 
-def _find_best_sarimax_parameters(series):
-    """
-    Find the best SARIMAX parameters for a given time series.
-    
-    Parameters:
-    -----------
-    series : pandas.Series
-        Time series data
-        
-    Returns:
-    --------
-    tuple
-        Best parameters (p, d, q, P, D, Q, s)
-    """
-    best_aic = float('inf')
-    best_params = None
-    
-    # Define parameter grid for SARIMAX
-    # Keep it simple to avoid excessive computation time
-    p = d = q = range(0, 2)
-    P = D = Q = range(0, 2)
-    s = [7]  # Weekly seasonality
-    
-    # Generate all combinations of parameters
-    pdq = list(itertools.product(p, d, q))
-    seasonal_pdq = list(itertools.product(P, D, Q, s))
-    
-    # Sample a subset of combinations to reduce computation time
-    # Select a maximum of 4 combinations to try
-    if len(pdq) > 2:
-        import random
-        random.seed(42)  # For reproducibility
-        pdq = random.sample(pdq, 2)
-    
-    if len(seasonal_pdq) > 2:
-        import random
-        random.seed(42)  # For reproducibility
-        seasonal_pdq = random.sample(seasonal_pdq, 2)
-    
-    # Try each combination
-    for param in pdq:
-        for seasonal_param in seasonal_pdq:
-            try:
-                # Fit the model
-                mod = SARIMAX(series,
-                            order=param,
-                            seasonal_order=seasonal_param,
-                            enforce_stationarity=False,
-                            enforce_invertibility=False)
-                
-                results = mod.fit(disp=False, maxiter=50)
-                
-                # If this is the best model so far, save the parameters
-                if results.aic < best_aic:
-                    best_aic = results.aic
-                    best_params = (param, seasonal_param)
-            except:
-                continue
-    
-    # If no valid model found, use default parameters
-    if best_params is None:
-        best_params = ((1, 0, 1), (1, 0, 1, 7))
-    
-    # Unpack parameters for return
-    p, d, q = best_params[0]
-    P, D, Q, s = best_params[1]
-    
-    return p, d, q, P, D, Q, s
-
-
-def _forecast_ingredient_daily(ingredient, historical_data, future_dates):
+def _forecast_ingredient_daily(ingredient, historical_data, future_dates, cached_model=None):
     """
     Forecast daily usage for a single ingredient using SARIMAX.
     
+    When a cached model from a previous run is available and its order search is
+    recent enough, the search is skipped: if the data is unchanged the cached
+    parameters are reused as-is, otherwise the fit is warm-started from them.
+    
     Parameters:
     -----------
     ingredient : str
@@ -620,11 +628,13 @@ def _forecast_ingredient_daily(ingredient, historical_data, future_dates):
         Historical daily ingredient usage
     future_dates : pandas.DatetimeIndex
         Dates to forecast for
+    cached_model : dict, optional
+        Entry for this ingredient from the model store (see model_store.py)
         
     Returns:
     --------
     tuple
-        (ingredient name, forecasted values)
+        (ingredient name, forecasted values, model entry to cache or None)
     """
     try:
         # Extract the series for this ingredient
@@ -634,19 +644,48 @@ def _forecast_ingredient_daily(ingredient, historical_data, future_dates):
         if (series > 0).sum() < 7:
             raise ValueError("Insufficient data")
         
-        # Find best parameters
-        p, d, q, P, D, Q, s = _find_best_sarimax_parameters(series)
-        
-        # Fit SARIMAX model with the best parameters
-        model = SARIMAX(
-            series,
-            order=(p, d, q),
-            seasonal_order=(P, D, Q, s),
-            enforce_stationarity=False,
-            enforce_invertibility=False
-        )
+        fingerprint = series_fingerprint(series)
+        model_fit = None
         
-        model_fit = model.fit(disp=False, maxiter=100)  # Increased iterations for better convergence
+        if cached_model is not None and not is_search_due(cached_model):
+            try:
+                order = tuple(cached_model['order'])
+                seasonal_order = tuple(cached_model['seasonal_order'])
+                searched_on = cached_model['searched_on']
+                
+                model = load_sarimax()(
+                    series,
+                    order=order,
+                    seasonal_order=seasonal_order,
+                    enforce_stationarity=False,
+                    enforce_invertibility=False
+                )
+                cached_params = np.asarray(cached_model['params'])
+                
+                if cached_model['fingerprint'] == fingerprint:
+                    # Same data as last time: the cached parameters are already the fit
+                    model_fit = model.filter(cached_params)
+                else:
+                    # New days in the window: start the optimizer from last night's optimum
+                    model_fit = model.fit(start_params=cached_params, disp=False, maxiter=WARM_START_MAXITER)
+            except Exception as e:
+                print(f"  ⚠️ Cached SARIMAX model unusable for {ingredient}, searching again: {str(e)}")
+                model_fit = None
+        
+        aic_scores = cached_aic_scores(cached_model, fingerprint)
+        
+        if model_fit is None:
+            # Successive-halving order search; the winning fit is used directly
+            preferred = None
+            if cached_model is not None:
+                preferred = (tuple(cached_model.get('order', ())), tuple(cached_model.get('seasonal_order', ())))
+            with span('order_search', ingredient=str(ingredient)) as search_span:
+                order, seasonal_order, model_fit, fits_run = search_sarimax_order(series, aic_scores, preferred)
+                search_span['rows'] = fits_run
+            searched_on = datetime.date.today().isoformat()
+            
+            if model_fit is None:
+                raise ValueError("No SARIMAX candidate could be fitted")
         
         # Generate forecast
         forecast = model_fit.get_forecast(steps=len(future_dates))
@@ -666,124 +705,93 @@ def _forecast_ingredient_daily(ingredient, historical_data, future_dates):
             if not np.isnan(daily_avg):
                 forecast_values = forecast_values + (daily_avg * 0.1)  # Add 10% of daily average
         
+        model_entry = make_model_entry(
+            order, seasonal_order, model_fit.params, fingerprint, searched_on, aic_scores=aic_scores
+        )
+        
         print(f"  ✅ SARIMAX forecast completed for {ingredient} (daily)")
-        return (ingredient, forecast_values)
+        return (ingredient, forecast_values, model_entry)
     
     except Exception as e:
         print(f"  ⚠️ SARIMAX forecast failed for {ingredient} (daily): {str(e)}")
         
         # Fall back to a simpler method
-        return _fallback_forecast_daily(ingredient, historical_data, future_dates)
+        return _fallback_forecast_daily(ingredient, historical_data, future_dates) + (None,)
 
 
-def _forecast_ingredient_hourly(ingredient, historical_data, daily_forecast, future_dates):
+def _forecast_ingredient_daily_task(task, future_dates, fit_budget=None):
     """
-    Forecast hourly usage for a single ingredient.
-    Uses both SARIMAX for overall trend and pattern detection,
-    then distributes according to historical hourly patterns.
-    
-    Parameters:
-    -----------
-    ingredient : str
-        Name of the ingredient to forecast
-    historical_data : pandas.DataFrame
-        Historical hourly ingredient usage
-    daily_forecast : pandas.DataFrame
-        Daily forecasts from SARIMAX
-    future_dates : pandas.DatetimeIndex
-        Hours to forecast for
-        
+    Unpack an (ingredient, cached model) task for the worker pool, reading the shared daily history.
+
+    The fit is cancelled once it runs past fit_budget seconds and the fallback
+    forecast is returned instead.
+
     Returns:
     --------
     tuple
-        (ingredient name, forecasted values)
+        (ingredient name, forecasted values, model entry to cache or None,
+        whether the fit timed out, wall seconds the fit took)
     """
-    try:
-        # Initialize forecast Series
-        forecast_values = pd.Series(index=future_dates, data=0.0)
-        
-        # The goal is to distribute the daily forecasts according to hourly patterns
-        # First, find the hourly pattern
-        series = historical_data[ingredient]
-        
-        # Get hour of day factors
-        hour_factors = _calculate_hour_factors(series)
-        
-        # For each future day, distribute the daily forecast according to hour factors
-        for day in pd.date_range(future_dates[0].date(), future_dates[-1].date(), freq='D'):
-            # Skip if this day is not in the daily forecast
-            if day not in daily_forecast.index:
-                continue
-            
-            # Get the daily forecast for this day
-            daily_amount = daily_forecast.at[day, ingredient]
-            
-            # Distribute to hours in this day
-            day_hours = [dt for dt in future_dates if dt.date() == day.date()]
-            
-            for hour_dt in day_hours:
-                hour = hour_dt.hour
-                # Use the hour factor to distribute
-                if hour in hour_factors:
-                    forecast_values[hour_dt] = daily_amount * hour_factors[hour]
-        
-        print(f"  ✅ Hourly distribution completed for {ingredient}")
-        return (ingredient, forecast_values)
-    
-    except Exception as e:
-        print(f"  ⚠️ Hourly forecast failed for {ingredient}: {str(e)}")
-        
-        # Fall back to simple distribution
-        forecast_values = _distribute_daily_to_hourly(
-            ingredient, 
-            daily_forecast, 
-            historical_data,
-            future_dates
-        )
-        
-        return (ingredient, forecast_values)
+    ingredient, cached_model = task
+    historical_data = get_shared_frame('daily')
+    started = time.perf_counter()
+    with span('sarimax_fit', ingredient=str(ingredient), cached=cached_model is not None) as fit_span:
+        timed_out = False
+        try:
+            with time_budget(fit_budget):
+                result = _forecast_ingredient_daily(ingredient, historical_data, future_dates, cached_model)
+        except FitTimeout:
+            print(f"  ⏰ SARIMAX fit for {ingredient} exceeded its {fit_budget:g} s budget, using fallback")
+            result = _fallback_forecast_daily(ingredient, historical_data, future_dates) + (None,)
+            timed_out = True
+        fit_span['rows'] = len(historical_data)
+        fit_span['model'] = 'timeout' if timed_out else 'sarimax' if result[2] is not None else 'fallback'
+    return result + (timed_out, time.perf_counter() - started)
+
+
+def _expected_fit_kind(series, cached_model):
+    """Predict which fit _forecast_ingredient_daily will run: 'search', 'warm' or 'filter'"""
+    if cached_model is None or is_search_due(cached_model):
+        return 'search'
+    return 'filter' if cached_model.get('fingerprint') == series_fingerprint(series) else 'warm'
 
 
-def _calculate_hour_factors(series):
+def _calculate_hour_factors(historical_hourly):
     """
     Calculate hourly distribution factors from historical data.
     
     Parameters:
     -----------
-    series : pandas.Series
-        Historical hourly data for an ingredient
+    historical_hourly : pandas.DataFrame
+        Historical hourly data, one column per ingredient
         
     Returns:
     --------
-    dict
-        Dictionary mapping hours to their relative weights
+    pandas.DataFrame
+        24 x ingredients matrix of each hour's share of the daily total. Hours
+        never seen in the history get 0; ingredients without usage are uniform.
     """
-    # Group by hour and calculate average
-    hour_avgs = series.groupby(series.index.hour).mean()
+    # Average by hour of day for every ingredient at once
+    hour_avgs = historical_hourly.groupby(historical_hourly.index.hour).mean().reindex(range(24))
     
-    # Calculate total to get proportions
-    total = hour_avgs.sum()
+    # Calculate totals to get proportions
+    totals = hour_avgs.sum()
+    hour_factors = (hour_avgs / totals.where(totals > 0)).fillna(0.0)
     
-    # Convert to dictionary of factors
-    if total > 0:
-        hour_factors = {hour: avg / total for hour, avg in hour_avgs.items()}
-    else:
-        # If no historical data, use uniform distribution
-        hour_factors = {hour: 1/24 for hour in range(24)}
+    # If no historical data, use uniform distribution
+    hour_factors.loc[:, totals <= 0] = 1 / 24
     
     return hour_factors
 
 
-def _distribute_daily_to_hourly(ingredient, daily_forecast, historical_hourly, future_dates):
+def _distribute_daily_to_hourly(daily_forecast, historical_hourly, future_dates):
     """
     Distribute daily forecasts to hourly based on historical patterns.
     
     Parameters:
     -----------
-    ingredient : str
-        Name of the ingredient
     daily_forecast : pandas.DataFrame
-        DataFrame with daily forecasts
+        Daily forecasts, one column per ingredient
     historical_hourly : pandas.DataFrame
         Historical hourly data
     future_dates : pandas.DatetimeIndex
@@ -791,36 +799,78 @@ def _distribute_daily_to_hourly(ingredient, daily_forecast, historical_hourly, f
         
     Returns:
     --------
-    pandas.Series
-        Hourly forecast values
+    pandas.DataFrame
+        Hourly forecast values with the same columns as daily_forecast; hours
+        whose day is not in daily_forecast are 0
     """
-    # Calculate hourly factors
-    series = historical_hourly[ingredient]
-    hour_factors = _calculate_hour_factors(series)
+    hour_factors = _calculate_hour_factors(historical_hourly[daily_forecast.columns])
     
-    # Initialize forecast Series
-    forecast_values = pd.Series(index=future_dates, data=0.0)
+    # Daily total of each future hour's day (hours x ingredients)
+    daily_totals = daily_forecast.reindex(future_dates.normalize()).to_numpy(dtype=float)
     
-    # For each future day, distribute the daily forecast
-    for day in pd.date_range(future_dates[0].date(), future_dates[-1].date(), freq='D'):
-        # Skip if day is not in daily forecast
-        if day not in daily_forecast.index:
-            continue
-        
-        # Get daily amount
-        daily_amount = daily_forecast.at[day, ingredient]
-        
-        # Get hours in this day
-        day_hours = [dt for dt in future_dates if dt.date() == day.date()]
-        
-        # Distribute amount across hours
-        for hour_dt in day_hours:
-            hour = hour_dt.hour
-            # Use the hour factor to distribute
-            if hour in hour_factors:
-                forecast_values[hour_dt] = daily_amount * hour_factors[hour]
+    # Hour-of-day share of each future hour (hours x ingredients)
+    shares = hour_factors.to_numpy()[future_dates.hour]
+    
+    return pd.DataFrame(
+        np.nan_to_num(daily_totals * shares),
+        index=future_dates,
+        columns=daily_forecast.columns
+    )
+
+
+def _fallback_forecast_matrix(historical_daily, future_dates, adjust=True):
+    """
+    Fallback daily forecast for every ingredient column at once.
     
-    return forecast_values
+    Forecasts each day as the ingredient's historical average for that day of the
+    week. With adjust=True the forecast is also scaled by the recent trend (last
+    14 days vs the overall average, bounded to 0.5-2.0) and ingredients whose
+    forecast would round to nothing get a floor based on their smallest usage.
+    
+    Parameters:
+    -----------
+    historical_daily : pandas.DataFrame
+        Historical daily data, one column per ingredient
+    future_dates : pandas.DatetimeIndex
+        Future dates to forecast for
+    adjust : bool, optional
+        Apply the trend factor and minimum-usage floor (default: True)
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Forecasted values indexed by future_dates with the same columns
+    """
+    overall_avg = historical_daily.mean()
+    
+    # 7 x ingredients day-of-week averages; weekdays missing from the history use the overall average
+    day_of_week_avg = historical_daily.groupby(historical_daily.index.dayofweek).mean().reindex(range(7))
+    day_of_week_avg = day_of_week_avg.fillna(overall_avg.where(overall_avg > 0, 0.0))
+    
+    forecast = day_of_week_avg.to_numpy(dtype=float)[future_dates.dayofweek]
+    
+    if adjust:
+        # Recent trend factor (last 14 days vs overall average), limited to reasonable bounds
+        recent_days = 14
+        trend_factor = np.ones(len(historical_daily.columns))
+        if len(historical_daily) >= recent_days:
+            recent_avg = historical_daily.iloc[-recent_days:].mean().to_numpy(dtype=float)
+            overall = overall_avg.to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                trend_factor = np.where(overall > 0, np.clip(recent_avg / overall, 0.5, 2.0), 1.0)
+        
+        # Ensure no negative values
+        forecast = np.clip(forecast * trend_factor, 0, None)
+        
+        # Ensure we have at least some minimal forecast if there's historical usage
+        min_historical = historical_daily.where(historical_daily > 0).min().fillna(0.0).to_numpy(dtype=float)
+        needs_floor = (forecast.sum(axis=0) < 0.1) & (min_historical > 0)
+        if needs_floor.any():
+            # 20% of the minimum on Friday and weekend days, 10% otherwise
+            floor_share = np.where(np.isin(future_dates.dayofweek, [4, 5, 6]), 0.2, 0.1)
+            forecast[:, needs_floor] += np.outer(floor_share, min_historical[needs_floor])
+    
+    return pd.DataFrame(forecast, index=future_dates, columns=historical_daily.columns)
 
 
 def _fallback_forecast_daily(ingredient, historical_data, future_dates):
@@ -842,57 +892,7 @@ def _fallback_forecast_daily(ingredient, historical_data, future_dates):
     tuple
         (ingredient name, forecasted values)
     """
-    # Initialize forecast Series
-    forecast_values = pd.Series(index=future_dates, data=0.0)
-    
-    # Extract the series for this ingredient
-    series = historical_data[ingredient]
-    
-    # Calculate average by day of week
-    day_of_week_avg = series.groupby(series.index.dayofweek).mean()
-    
-    # Make sure we have values for all days
-    for day in range(7):
-        if day not in day_of_week_avg.index:
-            day_of_week_avg[day] = series.mean() if series.mean() > 0 else 0
-    
-    # Calculate a recent trend factor (last 14 days vs overall average)
-    recent_days = 14
-    if len(series) >= recent_days:
-        recent_data = series.iloc[-recent_days:]
-        recent_avg = recent_data.mean()
-        overall_avg = series.mean()
-        
-        # Avoid division by zero
-        if overall_avg > 0:
-            trend_factor = recent_avg / overall_avg
-            # Limit the trend factor to reasonable bounds
-            trend_factor = max(0.5, min(2.0, trend_factor))
-        else:
-            trend_factor = 1.0
-    else:
-        trend_factor = 1.0
-    
-    # Use day of week average for forecast, adjusted by trend
-    for date in future_dates:
-        day_of_week = date.dayofweek
-        base_forecast = day_of_week_avg[day_of_week]
-        # Apply trend factor
-        forecast_values[date] = base_forecast * trend_factor
-    
-    # Ensure no negative values
-    forecast_values = forecast_values.clip(lower=0)
-    
-    # Ensure we have at least some minimal forecast if there's historical usage
-    min_historical = series[series > 0].min() if not series[series > 0].empty else 0
-    if forecast_values.sum() < 0.1 and min_historical > 0:
-        # Add a small amount based on minimum historical usage
-        for date in future_dates:
-            day_of_week = date.dayofweek
-            if day_of_week in [4, 5, 6]:  # Weekend days + Friday
-                forecast_values[date] += min_historical * 0.2  # 20% of minimum
-            else:
-                forecast_values[date] += min_historical * 0.1  # 10% of minimum
+    forecast_values = _fallback_forecast_matrix(historical_data[[ingredient]], future_dates)[ingredient]
     
     print(f"  ✅ Enhanced fallback forecast completed for {ingredient} (daily)")
     return (ingredient, forecast_values)
@@ -921,59 +921,13 @@ def _forecast_with_fallback(ingredients_data, future_hours):
     future_days = (future_hours + 23) // 24  # Round up to nearest day
     future_daily_dates = pd.date_range(start=current_time.date(), periods=future_days, freq='D')
     
-    # Initialize forecast DataFrames
-    hourly_forecasts = pd.DataFrame(index=future_hourly_dates, columns=ingredients_data['hourly'].columns)
-    daily_forecasts = pd.DataFrame(index=future_daily_dates, columns=ingredients_data['daily'].columns)
-    
-    hourly_forecasts = hourly_forecasts.fillna(0.0)
-    daily_forecasts = daily_forecasts.fillna(0.0)
-    
     print("Using simple averaging method for forecasting...")
     
-    # Process each ingredient
-    for ingredient in ingredients_data['daily'].columns:
-        # Skip if no usage
-        if ingredients_data['daily'][ingredient].sum() == 0:
-            continue
-            
-        # Calculate average by day of week
-        ingredient_series = ingredients_data['daily'][ingredient]
-        day_of_week_avg = ingredient_series.groupby(ingredient_series.index.dayofweek).mean()
-        
-        # Calculate average by hour of day (for hourly distribution)
-        hourly_series = ingredients_data['hourly'][ingredient]
-        hour_of_day_avg = hourly_series.groupby(hourly_series.index.hour).mean()
-        
-        # Make sure we have values for all days and hours
-        for day in range(7):
-            if day not in day_of_week_avg.index:
-                day_of_week_avg[day] = ingredient_series.mean() if ingredient_series.mean() > 0 else 0
-                
-        for hour in range(24):
-            if hour not in hour_of_day_avg.index:
-                hour_of_day_avg[hour] = hourly_series.mean() if hourly_series.mean() > 0 else 0
-        
-        # Calculate the overall average
-        overall_mean = ingredient_series.mean()
-        
-        # Generate daily forecasts
-        for future_date in future_daily_dates:
-            # Use day of week average
-            day_factor = day_of_week_avg[future_date.dayofweek] / overall_mean if overall_mean > 0 else 0
-            daily_forecasts.at[future_date, ingredient] = day_factor * overall_mean
-        
-        # Generate hourly forecasts based on daily totals and hour distribution
-        hour_factors = _calculate_hour_factors(hourly_series)
-        
-        # Distribute daily forecasts to hours
-        for day in future_daily_dates:
-            day_total = daily_forecasts.at[day, ingredient]
-            day_hours = [dt for dt in future_hourly_dates if dt.date() == day.date()]
-            
-            for hour_dt in day_hours:
-                hour = hour_dt.hour
-                if hour in hour_factors:
-                    hourly_forecasts.at[hour_dt, ingredient] = day_total * hour_factors[hour]
+    # Day-of-week averages for every ingredient in one pass
+    daily_forecasts = _fallback_forecast_matrix(ingredients_data['daily'], future_daily_dates, adjust=False)
+    
+    # Generate hourly forecasts based on daily totals and hour distribution
+    hourly_forecasts = _distribute_daily_to_hourly(daily_forecasts, ingredients_data['hourly'], future_hourly_dates)
     
     print("✅ Completed fallback forecasting for all ingredients")
     
@@ -1378,13 +1332,22 @@ if __name__ == "__main__":
     parser.add_argument('--start', type=str, help='Start date in YYYY-MM-DD format')
     parser.add_argument('--end', type=str, help='End date in YYYY-MM-DD format')
     parser.add_argument('--save', action='store_true', help='Save forecasts to CSV file')
-    parser.add_argument('--clear-db', action='store_true', help='Clear existing forecast records before adding new ones')
+    parser.add_argument('--clear-db', action='store_true', help='Remove all previous forecast runs once the new one is stored')
     parser.add_argument('--auto-confirm', action='store_true', help='Skip confirmation prompts')
     parser.add_argument('--parallelize', action='store_true', help='Use parallel processing for SARIMAX models')
     parser.add_argument('--max-ingredients', type=int, default=0, help='Maximum number of ingredients to process with SARIMAX (0 = all)')
+    parser.add_argument('--no-model-cache', action='store_true', help='Ignore and do not update cached SARIMAX models')
+    parser.add_argument('--engine', choices=['incremental', 'sql', 'vectorized', 'python'], default='sql', help='Update the cached usage store (incremental), aggregate in Postgres (sql), with the recipe matrix (vectorized) or with the per-order loop (python) (default: sql)')
+    parser.add_argument('--hierarchy', choices=['ingredient', 'menu-item', 'category', 'total'], default='ingredient', help='Fit one model per ingredient, or forecast demand per menu item, per menu category or in total and derive ingredients through the recipes (default: ingredient)')
+    parser.add_argument('--fit-budget', type=float, default=SARIMAX_FIT_BUDGET_SECONDS, help=f'Seconds one ingredient\'s SARIMAX fit may take before falling back (default: {SARIMAX_FIT_BUDGET_SECONDS:.0f}, 0 = no limit)')
+    parser.add_argument('--forecast-deadline', type=float, default=FORECAST_DEADLINE_SECONDS, help=f'Seconds all SARIMAX fits may take together (default: {FORECAST_DEADLINE_SECONDS:.0f}, 0 = no limit)')
+    parser.add_argument('--trace', type=str, help='Write timing spans for every stage and SARIMAX fit to this JSON-lines file and print a summary')
     
     args = parser.parse_args()
     
+    if args.trace:
+        enable_tracing(args.trace)
+    
     # Set up date range based on arguments
     if args.start and args.end:
         try:
@@ -1400,29 +1363,28 @@ if __name__ == "__main__":
         print(f"📅 Analyzing {args.days} days of historical data")
     
     # Check database connection first
+    # All steps borrow from the same pool, so the connection set up here is reused later
     print("Testing database connection...")
-    conn = connect_to_db()
-    if conn is None:
-        print("❌ Could not connect to database. Please check your configuration in db_utils.py")
-        sys.exit(1)
-    print("✅ Database connection successful")
+    with pooled_connection() as conn:
+        if conn is None:
+            print("❌ Could not connect to database. Please check your configuration in db_utils.py")
+            sys.exit(1)
+        print("✅ Database connection successful")
     
     # Prompt to clear database if not specified in arguments and not auto-confirmed
+    # Old forecasts stay visible until the new run is published, then are pruned with it
     if not args.clear_db and not args.auto_confirm:
         user_input = input("Would you like to clear existing forecast records? (y/n): ")
         if user_input.lower() in ['y', 'yes']:
             args.clear_db = True
     
-    # Clear database if requested
-    if args.clear_db:
-        if not clear_forecast_database(conn):
-            print("⚠️ Warning: Failed to clear forecast database. Continuing with execution...")
-    
     # Step 1: Calculate historical ingredient needs
     print("\n" + "-" * 60)
     print("STEP 1: Calculating historical ingredient needs")
     print("-" * 60)
-    ingredients_data = calculate_ingredient_needs(start_date, end_date)
+    with span('calculate_ingredient_needs', engine=args.engine) as stage:
+        ingredients_data = calculate_ingredient_needs(start_date, end_date, engine=args.engine)
+        stage['rows'] = len(ingredients_data['hourly'])
     
     if ingredients_data['hourly'].empty:
         print("❌ No historical ingredient data available. Exiting.")
@@ -1442,7 +1404,22 @@ if __name__ == "__main__":
     forecast_hours = args.forecast * 24  # Convert days to hours
     
     # Use SARIMAX forecasting method
-    forecasts = forecast_future_needs(ingredients_data, forecast_hours)
+    with span('forecast_future_needs', hierarchy=args.hierarchy) as stage:
+        forecasts = None
+        if args.hierarchy != 'ingredient':
+            forecasts = forecast_needs_from_demand(
+                ingredients_data, forecast_hours, level=args.hierarchy, start_date=start_date, end_date=end_date,
+                use_model_cache=not args.no_model_cache, fit_budget=args.fit_budget, deadline=args.forecast_deadline
+            )
+            if forecasts is None:
+                print("⚠️ Menu item demand forecast failed. Forecasting each ingredient instead...")
+        if forecasts is None:
+            forecasts = forecast_future_needs(
+                ingredients_data, forecast_hours, use_model_cache=not args.no_model_cache,
+                fit_budget=args.fit_budget, deadline=args.forecast_deadline
+            )
+        stage['rows'] = forecasts['daily'].shape[1]
+        stage['timed_out'] = len(forecasts.get('timed_out', []))
     
     if forecasts['hourly'].empty:
         print("❌ Failed to generate forecasts. Exiting.")
@@ -1452,24 +1429,36 @@ if __name__ == "__main__":
     print("\n" + "-" * 60)
     print("STEP 3: Analyzing forecasts and generating recommendations")
     print("-" * 60)
-    analysis = analyze_forecast(forecasts)
-    recommendations = prepare_recommendations(forecasts)
+    with span('prepare_recommendations') as stage:
+        analysis = analyze_forecast(forecasts)
+        recommendations = prepare_recommendations(forecasts)
+        stage['rows'] = forecasts['daily'].size
     
     # Step 4: Generate traffic recommendations
     print("\n" + "-" * 60)
     print("STEP 4: Generating traffic recommendations")
     print("-" * 60)
-    traffic_recommendations = generate_traffic_recommendations(ingredients_data, forecasts)
+    with span('generate_traffic_recommendations') as stage:
+        traffic_recommendations = generate_traffic_recommendations(ingredients_data, forecasts)
+        stage['rows'] = len(traffic_recommendations)
     
     # Step 5: Store recommendations in a database
     print("\n" + "-" * 60)
     print("STEP 5: Storing recommendations in database")
     print("-" * 60)
-    success_prep = store_predictions_in_db(conn, forecasts, recommendations)
-    success_traffic = store_traffic_recommendations(conn, traffic_recommendations)
+    with span('store_forecasts') as stage, pooled_connection() as conn:
+        if conn is None:
+            print("❌ Could not connect to database to store recommendations.")
+            success_prep, success_traffic = [], []
+        else:
+            keep = 1 if args.clear_db else FORECAST_GENERATIONS_TO_KEEP
+            success_prep, success_traffic = store_forecast_run(
+                conn, forecasts, recommendations, traffic_recommendations, keep=keep
+            )
+        stage['rows'] = len(success_prep or []) + len(success_traffic or [])
     
-    # Close the database connection
-    conn.close()
+    # Close the pooled database connections
+    close_pool()
     
     # Save forecasts to CSV if requested
     if args.save:
@@ -1519,4 +1508,7 @@ if __name__ == "__main__":
         print("✅ Future prep recommendations successfully stored in database.")
     if success_traffic:
         print("✅ Traffic recommendations successfully stored in database.")
-    print("=" * 60)
\ No newline at end of file
+    print("=" * 60)
+    
+    if tracing_enabled():
+        print_trace_summary()
\ No newline at end of file
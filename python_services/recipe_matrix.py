@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+
+def hourly_usage_from_orders(orders, recipes, key='menuitemid'):
+    """
+    Vectorized replacement for the per-order DataFrame.at loop in calculate_ingredient_needs.
+
+    Orders are bucketed into an hour x menu item count matrix with np.bincount and
+    the ingredient cube comes from one sparse multiply with the recipe matrix.
+    Menu items are matched to recipe rows by integer id with a binary search over
+    the sorted id array, so no names are hashed and no per-row Python objects are built.
+
+    Parameters:
+    -----------
+    orders : pandas.DataFrame or dict
+        Columnar orders from fetch_historical_orders_columnar, with at least
+        ordertimestamp and the menu item id column
+    recipes : dict
+        Recipe store from recipe_store.get_recipe_matrix (or build_recipe_store)
+    key : str, optional
+        Order field holding the menu item id (default: 'menuitemid')
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame indexed by hourly timestamps (first order hour through one past
+        the last) with one float column per ingredient id, empty if there are no
+        orders or recipes.
+    """
+    if orders is None or not len(orders[key]) or recipes is None or not len(recipes['menu_item_ids']):
+        return pd.DataFrame()
+
+    recipe_matrix = recipes['matrix']
+    menu_item_ids = recipes['menu_item_ids']
+
+    # Hour bucket of every order item, relative to the first hour
+    order_hours = pd.DatetimeIndex(orders['ordertimestamp']).floor('h')
+    start_time = order_hours.min()
+    end_time = order_hours.max() + pd.Timedelta(hours=1)
+    date_range = pd.date_range(start=start_time, end=end_time, freq='h')
+    hour_positions = ((order_hours - start_time) // pd.Timedelta(hours=1)).to_numpy()
+
+    # Recipe row of every order item; items without ingredient data are skipped
+    order_item_ids = np.asarray(orders[key], dtype=np.int64)
+    item_positions = np.minimum(np.searchsorted(menu_item_ids, order_item_ids), len(menu_item_ids) - 1)
+    matched = menu_item_ids[item_positions] == order_item_ids
+    print(f"Processed {int(matched.sum())} orders, skipped {int((~matched).sum())} orders.")
+
+    # Hour x menu item counts in one pass over flattened cell ids
+    num_items = len(menu_item_ids)
+    cell_ids = hour_positions[matched] * num_items + item_positions[matched]
+    counts = np.bincount(cell_ids, minlength=len(date_range) * num_items).reshape(len(date_range), num_items)
+
+    # (hours x items) @ (items x ingredients) -> hours x ingredients
+    usage = np.asarray((recipe_matrix.T @ counts.T).T, dtype=float)
+
+    return pd.DataFrame(usage, index=date_range, columns=pd.Index(recipes['ingredient_ids'], dtype=np.int64))
@@ -0,0 +1,198 @@
+import os
+import numpy as np
+from scipy import sparse
+from db_utils import pooled_connection
+
+# Local cache of the recipe matrix, reused until the menu or a recipe changes
+RECIPE_STORE_PATH = os.getenv(
+    'RECIPE_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'recipe_matrix.npz')
+)
+
+# Cheap fingerprint of every recipe line (usage_store also uses it to invalidate its cube)
+RECIPE_CHECKSUM_QUERY = """
+SELECT md5(COALESCE(string_agg(menuitemid || ':' || ingredientid || ':' || quantity, ','
+                               ORDER BY menuitemid, ingredientid), ''))
+FROM menuitemingredients
+"""
+
+# One round trip that changes whenever a menu item is edited, renamed, added or
+# removed, or any recipe line changes
+RECIPE_VERSION_QUERY = f"""
+SELECT
+    (SELECT COALESCE(MAX(updatedat)::text, '') FROM menuitems)
+    || '|' || (SELECT md5(COALESCE(string_agg(menuitemid || ':' || name, ',' ORDER BY menuitemid), ''))
+               FROM menuitems)
+    || '|' || ({RECIPE_CHECKSUM_QUERY.strip()})
+"""
+
+RECIPE_ROWS_QUERY = """
+SELECT
+    mi.menuitemid,
+    m.name,
+    mi.ingredientid,
+    mi.quantity
+FROM
+    menuitemingredients mi
+JOIN
+    menuitems m ON mi.menuitemid = m.menuitemid
+ORDER BY
+    mi.menuitemid, mi.ingredientid
+"""
+
+# Recipe matrix for the current process, reused while its version still matches
+_recipe_cache = None
+
+
+def build_recipe_store(rows, version):
+    """
+    Pack recipe rows into an integer-indexed sparse matrix.
+
+    Parameters:
+    -----------
+    rows : list
+        [(menuitemid, menu item name, ingredientid, quantity), ...]
+    version : str
+        Result of RECIPE_VERSION_QUERY when the rows were read
+
+    Returns:
+    --------
+    dict
+        {'matrix': scipy.sparse.csr_matrix, 'menu_item_ids': int32 array,
+        'menu_item_names': str array, 'ingredient_ids': int32 array, 'version': str}
+        where matrix row i / column j hold the quantity of ingredient_ids[j]
+        used by one menu_item_ids[i]; both id arrays are sorted
+    """
+    menu_item_ids = np.array([row[0] for row in rows], dtype=np.int32)
+    ingredient_ids = np.array([row[2] for row in rows], dtype=np.int32)
+    quantities = np.array([row[3] for row in rows], dtype=float)
+    names = {row[0]: row[1] for row in rows}
+
+    unique_menu_items, item_positions = np.unique(menu_item_ids, return_inverse=True)
+    unique_ingredients, ingredient_positions = np.unique(ingredient_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (quantities, (item_positions, ingredient_positions)),
+        shape=(len(unique_menu_items), len(unique_ingredients))
+    )
+    return {
+        'matrix': matrix,
+        'menu_item_ids': unique_menu_items,
+        'menu_item_names': np.array([names[item] for item in unique_menu_items.tolist()], dtype=str),
+        'ingredient_ids': unique_ingredients,
+        'version': version,
+    }
+
+
+def load_recipe_store(path=RECIPE_STORE_PATH):
+    """
+    Load the cached recipe matrix.
+
+    Returns:
+    --------
+    dict or None
+        Same structure as build_recipe_store, or None if there is no readable store
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            matrix = sparse.csr_matrix(
+                (data['data'], data['indices'], data['indptr']),
+                shape=tuple(data['shape'])
+            )
+            return {
+                'matrix': matrix,
+                'menu_item_ids': data['menu_item_ids'],
+                'menu_item_names': data['menu_item_names'],
+                'ingredient_ids': data['ingredient_ids'],
+                'version': str(data['version']),
+            }
+    except Exception as e:
+        print(f"⚠️ Could not read recipe store {path}: {e}")
+        return None
+
+
+def save_recipe_store(store, path=RECIPE_STORE_PATH):
+    """Write the recipe matrix to disk atomically"""
+    matrix = store['matrix']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp.npz"
+    np.savez(
+        temp_path,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.asarray(matrix.shape),
+        menu_item_ids=store['menu_item_ids'],
+        menu_item_names=store['menu_item_names'],
+        ingredient_ids=store['ingredient_ids'],
+        version=store['version'],
+    )
+    os.replace(temp_path, path)
+
+
+def _read_recipe_matrix(conn, path):
+    """Version check, then memory, disk or a full read, in that order"""
+    global _recipe_cache
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(RECIPE_VERSION_QUERY)
+        version = cursor.fetchone()[0]
+
+        if _recipe_cache is not None and _recipe_cache['version'] == version:
+            return _recipe_cache
+
+        store = load_recipe_store(path)
+        if store is None or store['version'] != version:
+            print("Recipes changed since the last run. Rebuilding the recipe matrix...")
+            cursor.execute(RECIPE_ROWS_QUERY)
+            store = build_recipe_store(cursor.fetchall(), version)
+            try:
+                save_recipe_store(store, path)
+            except OSError as e:
+                print(f"⚠️ Could not write recipe store {path}: {e}")
+        else:
+            print("✅ Recipes unchanged. Using the cached recipe matrix")
+
+        _recipe_cache = store
+        return store
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def get_recipe_matrix(conn=None, path=RECIPE_STORE_PATH):
+    """
+    Return the recipe matrix, re-reading recipes only when they have changed.
+
+    Every call costs one small version query (RECIPE_VERSION_QUERY); the matrix
+    itself comes from this process's memory or from the on-disk store while
+    the version still matches, and is rebuilt from menuitemingredients otherwise.
+
+    Parameters:
+    -----------
+    conn : psycopg2.extensions.connection, optional
+        Open connection to use; borrows one from the pool if omitted
+    path : str, optional
+        Location of the .npz store (default: cache/recipe_matrix.npz, or RECIPE_STORE_PATH)
+
+    Returns:
+    --------
+    dict or None
+        Recipe store (see build_recipe_store), or None if the database could not be read
+    """
+    try:
+        if conn is not None:
+            return _read_recipe_matrix(conn, path)
+        with pooled_connection() as conn:
+            if conn is None:
+                print("❌ Failed to connect to the database.")
+                return None
+            return _read_recipe_matrix(conn, path)
+    except Exception as e:
+        print(f"❌ Error reading recipes: {e}")
+        return None
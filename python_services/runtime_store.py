@@ -0,0 +1,134 @@
+import json
+import os
+import numpy as np
+
+# Measured SARIMAX fit times per ingredient, used to schedule the slowest fits first
+RUNTIME_STORE_PATH = os.getenv(
+    'RUNTIME_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'fit_runtimes.json')
+)
+
+# Weight of the newest measurement in the smoothed fit time
+RUNTIME_SMOOTHING = 0.5
+
+# Rough seconds per day of history for each kind of fit, used until an ingredient has
+# been timed: a full order search, a warm start from cached parameters, or a filter
+# pass over unchanged data with cached parameters
+FIT_SECONDS_PER_DAY = {'search': 0.01, 'warm': 0.002, 'filter': 0.0002}
+
+
+def load_runtime_store(path=RUNTIME_STORE_PATH):
+    """
+    Load recorded fit times.
+
+    Returns:
+    --------
+    dict
+        {str(ingredient): {fit kind: smoothed seconds}}; empty if there is no readable store
+    """
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read fit runtime store {path}: {e}")
+        return {}
+
+
+def save_runtime_store(store, active_ingredients=None, path=RUNTIME_STORE_PATH):
+    """Write the runtime store to disk atomically, dropping ingredients not in active_ingredients"""
+    if active_ingredients is not None:
+        active = {str(ingredient) for ingredient in active_ingredients}
+        store = {key: value for key, value in store.items() if key in active}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def record_fit_time(store, ingredient, kind, seconds):
+    """Fold one measured fit time into the ingredient's smoothed time for that kind of fit"""
+    times = store.setdefault(str(ingredient), {})
+    previous = times.get(kind)
+    if previous is None:
+        times[kind] = round(float(seconds), 4)
+    else:
+        times[kind] = round(RUNTIME_SMOOTHING * float(seconds) + (1 - RUNTIME_SMOOTHING) * previous, 4)
+
+
+def estimate_fit_seconds(series, kind):
+    """
+    Guess the fit time of a series that has not been timed yet.
+
+    Longer histories cost more per optimizer step, and sparse series converge
+    faster than dense ones, so the estimate scales with length and non-zero share.
+    """
+    values = np.asarray(series, dtype=float)
+    if not len(values):
+        return 0.0
+    density = np.count_nonzero(values) / len(values)
+    return FIT_SECONDS_PER_DAY[kind] * len(values) * (0.5 + density)
+
+
+def expected_fit_seconds(series_by_ingredient, kinds, runtime_store):
+    """
+    Expected fit time of every ingredient for this run.
+
+    Ingredients timed in a previous run use their recorded time for the same kind of
+    fit. The rest use estimate_fit_seconds, rescaled by how far the estimates were
+    off for the ingredients that do have recorded times.
+
+    Parameters:
+    -----------
+    series_by_ingredient : dict
+        {ingredient: daily usage series}
+    kinds : dict
+        {ingredient: 'search', 'warm' or 'filter'}, the fit each ingredient will get
+    runtime_store : dict
+        Recorded fit times (see load_runtime_store)
+
+    Returns:
+    --------
+    dict
+        {ingredient: expected seconds}
+    """
+    estimates = {ingredient: estimate_fit_seconds(series, kinds[ingredient])
+                 for ingredient, series in series_by_ingredient.items()}
+    recorded = {}
+    for ingredient in series_by_ingredient:
+        seconds = runtime_store.get(str(ingredient), {}).get(kinds[ingredient])
+        if seconds is not None:
+            recorded[ingredient] = seconds
+
+    ratios = [recorded[ingredient] / estimates[ingredient] for ingredient in recorded if estimates[ingredient] > 0]
+    scale = float(np.median(ratios)) if ratios else 1.0
+
+    return {
+        ingredient: recorded.get(ingredient, estimates[ingredient] * scale)
+        for ingredient in series_by_ingredient
+    }
+
+
+def longest_first(tasks, costs):
+    """
+    Order tasks by expected cost, most expensive first.
+
+    Handing the slowest fits out first keeps one long fit from starting last and
+    running on alone while the other workers sit idle. Ties keep their original order.
+
+    Parameters:
+    -----------
+    tasks : list
+        Tasks whose first element is the ingredient
+    costs : dict
+        {ingredient: expected seconds}
+
+    Returns:
+    --------
+    list
+        The same tasks, reordered
+    """
+    return sorted(tasks, key=lambda task: -costs.get(task[0], 0.0))
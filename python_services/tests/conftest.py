@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The services are plain scripts imported by module name, as when run from python_services/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,162 @@
+import contextlib
+import datetime
+import random
+from decimal import Decimal
+import pandas as pd
+import pytest
+import calculate_ingredient_needs
+import fetch_ingredient_usage
+from recipe_store import build_recipe_store
+
+# Menu item 99 has no recipe, so both engines must skip it
+UNKNOWN_MENU_ITEM = 99
+
+
+def make_orders(count=2000, days=5, seed=7):
+    """Order item dicts shaped like fetch_historical_orders rows, with a gap of empty hours"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc)
+    orders = []
+    for i in range(count):
+        offset = rng.randrange(days * 86400)
+        if 86400 <= offset < 86400 + 6 * 3600:
+            continue
+        orders.append({
+            'orderid': i,
+            'ordertimestamp': start + datetime.timedelta(seconds=offset),
+            'menuitemid': rng.choice([1, 2, 3, 5, 8, UNKNOWN_MENU_ITEM]),
+        })
+    orders.sort(key=lambda order: order['ordertimestamp'])
+    return orders
+
+
+def make_recipe_rows():
+    """menuitemingredients rows as (menuitemid, name, ingredientid, quantity)"""
+    return [
+        (1, 'Burger', 10, 1), (1, 'Burger', 11, 2), (1, 'Burger', 14, 1),
+        (2, 'Cheeseburger', 10, 1), (2, 'Cheeseburger', 11, 2), (2, 'Cheeseburger', 12, 1),
+        (3, 'Fries', 13, 3),
+        (5, 'Salad', 14, 2), (5, 'Salad', 15, 0.5),
+        (8, 'Combo', 10, 1), (8, 'Combo', 13, 2), (8, 'Combo', 16, 1),
+    ]
+
+
+def make_recipes():
+    return build_recipe_store(make_recipe_rows(), 'test')
+
+
+class FixtureUsageCursor:
+    """
+    Answers fetch_ingredient_usage's queries from fixture orders and recipes the
+    way Postgres would: the window bounds and item counts, the distinct recipe
+    ingredients, and HOURLY_INGREDIENT_USAGE_QUERY's date_trunc('hour') buckets
+    of the order/recipe inner join, summed per hour and ingredient and ordered
+    by both. Quantities come back as Decimal, like numeric columns in psycopg2.
+    """
+
+    def __init__(self, orders, recipe_rows):
+        self.items = pd.DataFrame(orders)
+        self.recipes = pd.DataFrame(recipe_rows, columns=['menuitemid', 'name', 'ingredientid', 'quantity'])
+        self.result = None
+
+    def execute(self, query, params=None):
+        if query == fetch_ingredient_usage.ORDER_WINDOW_QUERY:
+            items = self._window(*params)
+            matched = items['menuitemid'].isin(self.recipes['menuitemid']).sum()
+            self.result = [(items['ordertimestamp'].min().to_pydatetime(),
+                            items['ordertimestamp'].max().to_pydatetime(), len(items), int(matched))]
+        elif query == fetch_ingredient_usage.RECIPE_INGREDIENTS_QUERY:
+            self.result = [(int(ingredient),) for ingredient in sorted(self.recipes['ingredientid'].unique())]
+        elif query == fetch_ingredient_usage.HOURLY_INGREDIENT_USAGE_QUERY:
+            joined = self._window(*params).merge(self.recipes, on='menuitemid')
+            joined['hour'] = joined['ordertimestamp'].dt.floor('h')
+            usage = joined.groupby(['hour', 'ingredientid'], sort=True)['quantity'].sum()
+            self.result = [(hour.to_pydatetime(), int(ingredient), Decimal(str(quantity)))
+                           for (hour, ingredient), quantity in usage.items()]
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    def _window(self, start_date, end_date):
+        timestamps = self.items['ordertimestamp']
+        return self.items[(timestamps >= start_date) & (timestamps <= end_date)]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def synthetic_engine_inputs(monkeypatch):
+    """Serve the same synthetic orders to both engines: row dicts to the loop, columns to the vectorized path"""
+    orders = make_orders()
+    columns = pd.DataFrame({
+        'ordertimestamp': [order['ordertimestamp'] for order in orders],
+        'menuitemid': pd.Series([order['menuitemid'] for order in orders], dtype='int32').astype('category'),
+    })
+    recipes = make_recipes()
+    monkeypatch.setattr(calculate_ingredient_needs, 'fetch_historical_orders', lambda start, end: orders)
+    monkeypatch.setattr(calculate_ingredient_needs, 'fetch_historical_orders_columnar', lambda start, end, **kwargs: columns)
+    monkeypatch.setattr(calculate_ingredient_needs, 'get_recipe_matrix', lambda: recipes)
+    return orders, recipes
+
+
+def test_vectorized_engine_matches_python_loop(synthetic_engine_inputs):
+    python_df = calculate_ingredient_needs._calculate_hourly_needs_python(vectorized=False)
+    vectorized_df = calculate_ingredient_needs._calculate_hourly_needs_python(vectorized=True)
+
+    assert not python_df.empty
+    columns = sorted(python_df.columns)
+    assert sorted(vectorized_df.columns) == columns
+    pd.testing.assert_frame_equal(
+        python_df[columns], vectorized_df[columns],
+        check_column_type=False, check_freq=False
+    )
+
+
+def test_sql_engine_matches_python_loop(synthetic_engine_inputs, monkeypatch):
+    orders, _ = synthetic_engine_inputs
+    cursor = FixtureUsageCursor(orders, make_recipe_rows())
+
+    @contextlib.contextmanager
+    def fixture_connection():
+        yield type('FixtureConnection', (), {'cursor': lambda self: cursor})()
+
+    monkeypatch.setattr(fetch_ingredient_usage, 'pooled_connection', fixture_connection)
+    start_date = datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc)
+    end_date = start_date + datetime.timedelta(days=7)
+
+    python_df = calculate_ingredient_needs._calculate_hourly_needs_python(start_date, end_date, vectorized=False)
+    # The default engine, through calculate_ingredient_needs' dispatch
+    sql_df = calculate_ingredient_needs.calculate_ingredient_needs(start_date, end_date, engine='sql')
+
+    columns = sorted(python_df.columns)
+    assert list(sql_df.columns) == columns
+    pd.testing.assert_frame_equal(
+        python_df[columns], sql_df,
+        check_column_type=False, check_freq=False
+    )
+
+
+def test_engines_skip_menu_items_without_recipes(synthetic_engine_inputs):
+    orders, recipes = synthetic_engine_inputs
+    vectorized_df = calculate_ingredient_needs._calculate_hourly_needs_python(vectorized=True)
+
+    # Every known order item contributes its recipe total; unknown items contribute nothing
+    recipe_totals = dict(zip(recipes['menu_item_ids'].tolist(), recipes['matrix'].sum(axis=1).A1))
+    expected = sum(recipe_totals.get(order['menuitemid'], 0.0) for order in orders)
+    assert vectorized_df.to_numpy().sum() == pytest.approx(expected)
+
+
+def test_frames_match_reports_differences():
+    index = pd.date_range('2025-03-01', periods=3, freq='h', tz='UTC')
+    expected = pd.DataFrame({10: [1.0, 2.0, 3.0], 11: [0.0, 1.0, 0.0]}, index=index)
+
+    assert calculate_ingredient_needs._frames_match('same', expected, expected[[11, 10]].copy(), 1e-9)
+    changed = expected.copy()
+    changed.iloc[1, 0] += 0.5
+    assert not calculate_ingredient_needs._frames_match('changed', expected, changed, 1e-9)
@@ -0,0 +1,69 @@
+import datetime
+import pandas as pd
+import pytest
+import prediction_create
+
+
+class FakeCursor:
+    rowcount = 0
+
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, query, params=None):
+        self.log.append(query.split()[0])
+
+    def fetchone(self):
+        return (7,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records the first keyword of every statement, plus commits and rollbacks"""
+
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.log.append('COMMIT')
+
+    def rollback(self):
+        self.log.append('ROLLBACK')
+
+
+@pytest.fixture
+def todays_run():
+    """A one-day horizon: the only prep row is today's, so no prep rows are stored"""
+    today = pd.Timestamp(datetime.date.today())
+    forecasts = {'hourly': pd.DataFrame({1: [1.0]})}
+    recommendations = {'daily_needs': pd.DataFrame({1: [5.0]}, index=[today])}
+    traffic_recommendations = {today: 'Expect a busy lunch'}
+    return forecasts, recommendations, traffic_recommendations
+
+
+def test_run_without_prep_rows_still_publishes_traffic(monkeypatch, todays_run):
+    monkeypatch.setattr(prediction_create, 'insert_forecasts', lambda cursor, rows, created_at, run_id: list(range(len(rows))))
+    conn = FakeConnection()
+
+    prep_ids, traffic_ids = prediction_create.store_forecast_run(conn, *todays_run)
+
+    assert prep_ids == [] and traffic_ids == [0]
+    # Published (the run row is updated), never rolled back
+    assert 'UPDATE' in conn.log and 'ROLLBACK' not in conn.log
+    assert conn.log[-1] == 'COMMIT'
+
+
+def test_failed_writer_abandons_the_run(monkeypatch, todays_run):
+    def fail(cursor, rows, created_at, run_id):
+        raise RuntimeError('insert failed')
+
+    monkeypatch.setattr(prediction_create, 'insert_forecasts', fail)
+    conn = FakeConnection()
+
+    assert prediction_create.store_forecast_run(conn, *todays_run) == ([], [])
+    assert conn.log[-4:] == ['ROLLBACK', 'ROLLBACK', 'DELETE', 'COMMIT']
@@ -0,0 +1,53 @@
+import warnings
+import numpy as np
+import pandas as pd
+from order_search import load_sarimax, search_sarimax_order, SEARCH_RUNGS
+
+# The old search: a 2x2 sample fitted to 50 iterations, then the winner refitted to 100
+LEGACY_ITERATIONS = 4 * 50 + 100
+
+
+def make_series(days=90, seed=3):
+    """Daily usage with a weekly pattern, like one ingredient column of the daily frame"""
+    rng = np.random.default_rng(seed)
+    weekly = np.tile([0, 5, 10, 3, 0, 30, 40], days // 7 + 1)[:days]
+    values = rng.poisson(20, days).astype(float) + weekly
+    return pd.Series(values, index=pd.date_range('2025-01-01', periods=days, freq='D'))
+
+
+def test_fits_emit_no_statsmodels_warnings():
+    from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+    with warnings.catch_warnings(record=True) as log:
+        # The nightly script ignores all warnings, then statsmodels' import puts
+        # its own "always" filters in front of that
+        warnings.filterwarnings('ignore')
+        warnings.simplefilter('always', ConvergenceWarning)
+
+        model = load_sarimax()(
+            make_series(),
+            order=(1, 0, 1),
+            seasonal_order=(1, 0, 1, 7),
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        model.fit(disp=False, maxiter=5)
+        search_sarimax_order(make_series(seed=4))
+
+    assert [str(warning.message) for warning in log] == []
+
+
+def test_default_search_screens_wide_within_the_legacy_budget():
+    aic_cache = {}
+    _, _, fit, fits_run = search_sarimax_order(make_series(), aic_cache)
+
+    rung_sizes = [sum(key.endswith(f"@{maxiter}") for key in aic_cache) for maxiter in SEARCH_RUNGS]
+    assert rung_sizes[0] >= 16
+    assert rung_sizes == sorted(rung_sizes, reverse=True) and rung_sizes[-1] == 1
+    assert sum(size * maxiter for size, maxiter in zip(rung_sizes, SEARCH_RUNGS)) <= LEGACY_ITERATIONS
+    assert fit is not None
+    assert fits_run == sum(rung_sizes)
+
+    # A rerun on the same series only refits the cached winner
+    _, _, fit, fits_run = search_sarimax_order(make_series(), aic_cache)
+    assert fit is not None and fits_run == 1
@@ -0,0 +1,221 @@
+import contextlib
+import functools
+import json
+import os
+import platform
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: spans are recorded without memory figures
+    resource = None
+
+# JSON-lines trace file; tracing is off unless this is set or enable_tracing is called.
+# Worker processes read it at import (spawn) or inherit it (fork), so their spans land in the same file.
+TRACE_PATH_ENV = 'PIPELINE_TRACE'
+
+_trace_path = os.getenv(TRACE_PATH_ENV) or None
+
+# Names of the spans currently open in this process, innermost last
+_open_spans = []
+
+
+def enable_tracing(path, truncate=True):
+    """
+    Start writing spans to a JSON-lines trace file.
+
+    Parameters:
+    -----------
+    path : str
+        Trace file; one JSON object is appended per finished span
+    truncate : bool, optional
+        Start the file empty (default: True)
+    """
+    global _trace_path
+    if truncate:
+        with open(path, 'w', encoding='utf-8'):
+            pass
+    _trace_path = path
+    os.environ[TRACE_PATH_ENV] = path
+
+
+def tracing_enabled():
+    """Check whether spans are being recorded"""
+    return _trace_path is not None
+
+
+def _peak_rss_mb():
+    """
+    Peak resident set size of this process so far in MB, or None without the resource module.
+
+    ru_maxrss is a lifetime high-water mark (KB on Linux, bytes on macOS), not the
+    current size, so it never goes down between spans.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def _children_cpu_seconds():
+    """User + system CPU time of reaped child processes, or 0 without the resource module"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _write_span(record):
+    """Append one span; a single short write keeps lines from concurrent workers intact"""
+    line = json.dumps(record, default=str) + '\n'
+    with open(_trace_path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Time a block and record it in the trace.
+
+    Records wall time, CPU time of this process and of reaped worker processes,
+    the process's peak RSS so far (peak_rss_so_far_mb, cumulative over the
+    process lifetime) and how much this span raised it (peak_rss_growth_mb).
+    Memory fields are None where the resource module is missing (Windows).
+    The yielded dict can be filled in while the block runs, e.g.
+    span_attributes['rows'] = len(frame); every key ends up in the
+    record. With tracing off this only yields an empty dict.
+
+    Parameters:
+    -----------
+    name : str
+        Span name, e.g. a pipeline stage
+    **attributes
+        Extra fields for the record, e.g. ingredient=42
+
+    Yields:
+    -------
+    dict
+        Attributes of the span
+    """
+    if _trace_path is None:
+        yield {}
+        return
+
+    parent = _open_spans[-1] if _open_spans else None
+    _open_spans.append(name)
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    children_start = _children_cpu_seconds()
+    peak_start = _peak_rss_mb()
+    try:
+        yield attributes
+    except BaseException as e:
+        attributes['error'] = type(e).__name__
+        raise
+    finally:
+        _open_spans.pop()
+        peak_end = _peak_rss_mb()
+        record = {
+            'name': name,
+            'parent': parent,
+            'pid': os.getpid(),
+            'start': round(started_at, 6),
+            'wall_seconds': round(time.perf_counter() - wall_start, 6),
+            'cpu_seconds': round(time.process_time() - cpu_start, 6),
+            'children_cpu_seconds': round(_children_cpu_seconds() - children_start, 6),
+            'peak_rss_so_far_mb': peak_end,
+            'peak_rss_growth_mb': round(peak_end - peak_start, 1) if peak_end is not None else None,
+        }
+        record.update(attributes)
+        _write_span(record)
+
+
+def traced(name=None):
+    """
+    Decorator form of span, named after the function unless name is given.
+
+    With tracing off the wrapped function is called directly.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace_path is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_trace(path):
+    """Read every span record from a trace file, skipping lines that do not parse"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def print_trace_summary(path=None, top=10):
+    """
+    Print per-span totals and the slowest per-ingredient spans from a trace file.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Trace file written by span (default: the file currently being traced to)
+    top : int, optional
+        Slowest ingredient spans to list (default: 10)
+    """
+    path = path or _trace_path
+    records = load_trace(path)
+    if not records:
+        print(f"⚠️ No spans recorded in {path}")
+        return
+
+    totals = {}
+    for record in records:
+        entry = totals.setdefault(record['name'], {'count': 0, 'wall': 0.0, 'max': 0.0, 'cpu': 0.0, 'rows': 0, 'rss': 0.0, 'growth': 0.0})
+        entry['count'] += 1
+        entry['wall'] += record['wall_seconds']
+        entry['max'] = max(entry['max'], record['wall_seconds'])
+        entry['cpu'] += record['cpu_seconds'] + record.get('children_cpu_seconds', 0.0)
+        entry['rows'] += int(record.get('rows') or 0)
+        entry['rss'] = max(entry['rss'], record.get('peak_rss_so_far_mb') or 0.0)
+        entry['growth'] += record.get('peak_rss_growth_mb') or 0.0
+
+    print(f"\n⏱️ Trace summary ({len(records)} spans, {path}):")
+    print("  (peak MB is the process high-water mark when the span ended; +MB is how much the span raised it)")
+    print(f"  {'span':<32} {'count':>6} {'wall s':>10} {'max s':>9} {'cpu s':>10} {'rows':>10} {'rows/s':>10} {'peak MB':>9} {'+MB':>7}")
+    for name, entry in sorted(totals.items(), key=lambda item: item[1]['wall'], reverse=True):
+        rows_per_second = f"{entry['rows'] / entry['wall']:,.0f}" if entry['rows'] and entry['wall'] > 0 else ''
+        print(f"  {name:<32} {entry['count']:>6} {entry['wall']:>10.3f} {entry['max']:>9.3f} {entry['cpu']:>10.3f} "
+              f"{entry['rows'] or '':>10} {rows_per_second:>10} {entry['rss']:>9.1f} {entry['growth']:>7.1f}")
+
+    per_ingredient = [record for record in records if 'ingredient' in record]
+    if per_ingredient:
+        print(f"\n🐢 Slowest ingredients:")
+        for record in sorted(per_ingredient, key=lambda r: r['wall_seconds'], reverse=True)[:top]:
+            details = ', '.join(
+                f"{key}={value}" for key, value in record.items()
+                if key not in ('name', 'parent', 'pid', 'start', 'wall_seconds', 'cpu_seconds',
+                               'children_cpu_seconds', 'peak_rss_so_far_mb', 'peak_rss_growth_mb', 'ingredient')
+            )
+            print(f"  - {record['name']} ingredient {record['ingredient']}: {record['wall_seconds']:.3f} s"
+                  f"{f' ({details})' if details else ''}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Summarise a JSON-lines trace written by the prediction pipeline')
+    parser.add_argument('path', help='Trace file')
+    parser.add_argument('--top', type=int, default=10, help='Slowest ingredient spans to list (default: 10)')
+    args = parser.parse_args()
+    print_trace_summary(args.path, args.top)
@@ -0,0 +1,297 @@
+import datetime
+import os
+import numpy as np
+import pandas as pd
+from db_utils import pooled_connection
+from fetch_ingredient_usage import fetch_hourly_ingredient_usage
+from recipe_store import RECIPE_CHECKSUM_QUERY
+
+# Local cache of the hourly ingredient usage cube, reused between nightly runs
+USAGE_STORE_PATH = os.getenv(
+    'USAGE_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'hourly_usage.npz')
+)
+
+# Order items per hour, used to pick the new watermark and to detect rewritten history
+HOURLY_ORDER_COUNT_QUERY = """
+SELECT
+    date_trunc('hour', o.ordertimestamp) AS hour,
+    COUNT(*)
+FROM
+    orders o
+JOIN
+    orderitems oi ON o.orderid = oi.orderid
+WHERE
+    o.ordertimestamp >= %s AND o.ordertimestamp <= %s
+GROUP BY
+    1
+ORDER BY
+    1
+"""
+
+# Newest order item when the store was saved; a primary key lookup, so validating
+# the store costs the same however long the window is
+LATEST_ORDER_ITEM_QUERY = """
+SELECT oi.orderitemid, oi.menuitemid, o.ordertimestamp
+FROM orderitems oi
+JOIN orders o ON o.orderid = oi.orderid
+ORDER BY oi.orderitemid DESC
+LIMIT 1
+"""
+
+# The stored anchor item as it is now; a different row (or none) means the order
+# tables were cleared or re-seeded since the store was saved
+ORDER_ITEM_ANCHOR_QUERY = """
+SELECT oi.menuitemid, o.ordertimestamp
+FROM orderitems oi
+JOIN orders o ON o.orderid = oi.orderid
+WHERE oi.orderitemid = %s
+"""
+
+# Items added since the store was saved that belong to hours the store already
+# covers; only the new id range is scanned
+BACKDATED_ORDER_ITEMS_QUERY = """
+SELECT COUNT(*)
+FROM orderitems oi
+JOIN orders o ON o.orderid = oi.orderid
+WHERE oi.orderitemid > %s AND o.ordertimestamp < %s
+"""
+
+
+def _floor_hour(timestamp):
+    """Round a timestamp down to the start of its hour"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def load_usage_store(path=USAGE_STORE_PATH):
+    """
+    Load the cached hourly usage cube.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Location of the .npz store (default: cache/hourly_usage.npz, or USAGE_STORE_PATH)
+
+    Returns:
+    --------
+    dict or None
+        {'hourly': DataFrame, 'order_counts': Series, 'watermark': Timestamp,
+        'recipe_checksum': str, 'anchor': (orderitemid, menuitemid, ordertimestamp
+        isoformat) or None}, or None if there is no readable store.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            index = pd.DatetimeIndex(data['hours'], tz='UTC')
+            if int(data['has_tz']):
+                index = index.tz_convert(datetime.timezone(datetime.timedelta(minutes=int(data['tz_offset_minutes']))))
+            else:
+                index = index.tz_localize(None)
+
+            hourly = pd.DataFrame(data['usage'], index=index, columns=data['ingredients'].tolist())
+            order_counts = pd.Series(data['order_counts'], index=index)
+            watermark = index[0] + pd.Timedelta(int(data['watermark_offset_hours']), unit='h')
+            anchor = None
+            if 'anchor_item_id' in data.files and int(data['anchor_item_id']) > 0:
+                anchor = (int(data['anchor_item_id']), int(data['anchor_menu_item_id']), str(data['anchor_timestamp']))
+
+            return {
+                'hourly': hourly,
+                'order_counts': order_counts,
+                'watermark': watermark,
+                'recipe_checksum': str(data['recipe_checksum']),
+                'anchor': anchor,
+            }
+    except Exception as e:
+        print(f"⚠️ Could not read hourly usage store {path}: {e}")
+        return None
+
+
+def save_usage_store(store, path=USAGE_STORE_PATH):
+    """
+    Write the hourly usage cube to disk atomically.
+
+    Parameters:
+    -----------
+    store : dict
+        Same structure as returned by load_usage_store
+    path : str, optional
+        Location of the .npz store
+    """
+    hourly = store['hourly']
+    has_tz = hourly.index.tz is not None
+    utc_index = hourly.index.tz_convert('UTC') if has_tz else hourly.index.tz_localize('UTC')
+    tz_offset = hourly.index[0].utcoffset() if has_tz else None
+    anchor = store.get('anchor') or (0, 0, '')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp.npz"
+    np.savez(
+        temp_path,
+        hours=utc_index.tz_localize(None).to_numpy(dtype='datetime64[ns]'),
+        ingredients=np.asarray(hourly.columns.tolist()),
+        usage=hourly.to_numpy(dtype=float),
+        order_counts=store['order_counts'].to_numpy(dtype=np.int64),
+        watermark_offset_hours=int((store['watermark'] - hourly.index[0]) / pd.Timedelta(hours=1)),
+        has_tz=int(has_tz),
+        tz_offset_minutes=int(tz_offset.total_seconds() // 60) if tz_offset is not None else 0,
+        recipe_checksum=store['recipe_checksum'],
+        anchor_item_id=int(anchor[0]),
+        anchor_menu_item_id=int(anchor[1]),
+        anchor_timestamp=anchor[2],
+    )
+    os.replace(temp_path, path)
+
+
+def calculate_hourly_usage_incremental(start_date=None, end_date=None, path=USAGE_STORE_PATH):
+    """
+    Maintain the hourly ingredient usage cube incrementally between runs.
+
+    Only orders at or after the stored watermark hour are aggregated (with the
+    SQL pushdown query) and merged into the cached cube; hours that have aged out
+    of the window are dropped. The whole cube is rebuilt when there is no store,
+    the recipes changed, or the order history it covers changed.
+
+    History is checked through the newest order item at the time the store was
+    saved (its anchor): if that row no longer exists or now has a different menu
+    item or timestamp, the order tables were cleared or re-seeded; if items added
+    since then belong to hours before the watermark, history was back-filled.
+    Both checks are index lookups over the anchor and the new id range, so a
+    nightly refresh costs O(new orders), not O(window). Orders are assumed to be
+    append-only otherwise: edits or deletes of old order items are not detected.
+    Databases re-seeded every night (Data_Automation.md) therefore rebuild on
+    every run; the incremental engine pays off on live, append-only order data.
+
+    The window is hour-aligned: it starts at the beginning of start_date's hour.
+
+    Parameters:
+    -----------
+    start_date : datetime.datetime, optional
+        Start date for the query range. If None, defaults to 90 days ago.
+    end_date : datetime.datetime, optional
+        End date for the query range. If None, defaults to current time.
+    path : str, optional
+        Location of the .npz store
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        Same hourly frame as fetch_hourly_ingredient_usage, empty if there is
+        no data, None if the database could not be queried.
+    """
+    # Calculate the date range if not provided
+    if end_date is None:
+        end_date = datetime.datetime.now()
+    if start_date is None:
+        start_date = end_date - datetime.timedelta(days=90)
+    window_start = _floor_hour(start_date)
+
+    store = load_usage_store(path)
+
+    with pooled_connection() as conn:
+        if conn is None:
+            print("❌ Failed to connect to the database.")
+            return None
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(RECIPE_CHECKSUM_QUERY)
+            recipe_checksum = cursor.fetchone()[0]
+
+            if store is not None and store['recipe_checksum'] != recipe_checksum:
+                print("Recipes changed since the last run. Rebuilding the hourly usage store...")
+                store = None
+
+            if store is not None:
+                # Compare against the database with the same tz-aware/naive flavour as the store
+                watermark = store['watermark']
+                kept_start = pd.Timestamp(window_start)
+                if watermark.tz is not None and kept_start.tz is None:
+                    kept_start = kept_start.tz_localize(watermark.tz)
+                elif watermark.tz is None and kept_start.tz is not None:
+                    kept_start = kept_start.tz_localize(None)
+
+                if watermark < kept_start:
+                    print("Hourly usage store is older than the window. Rebuilding...")
+                    store = None
+                elif store['anchor'] is None:
+                    print("Hourly usage store has no order item anchor. Rebuilding...")
+                    store = None
+                else:
+                    anchor_item_id, anchor_menu_item_id, anchor_timestamp = store['anchor']
+                    cursor.execute(ORDER_ITEM_ANCHOR_QUERY, (anchor_item_id,))
+                    row = cursor.fetchone()
+                    if row is None or (row[0], row[1].isoformat()) != (anchor_menu_item_id, anchor_timestamp):
+                        print("Order tables were cleared or re-seeded since the last run. Rebuilding the hourly usage store...")
+                        store = None
+                    else:
+                        cursor.execute(BACKDATED_ORDER_ITEMS_QUERY, (anchor_item_id, watermark.to_pydatetime()))
+                        if cursor.fetchone()[0]:
+                            print("Orders were added before the watermark. Rebuilding the hourly usage store...")
+                            store = None
+
+            # Taken before the counts; an item committed in between can at worst force one extra rebuild next run
+            cursor.execute(LATEST_ORDER_ITEM_QUERY)
+            latest = cursor.fetchone()
+            anchor = (latest[0], latest[1], latest[2].isoformat()) if latest is not None else None
+
+            fetch_from = store['watermark'].to_pydatetime() if store is not None else window_start
+            cursor.execute(HOURLY_ORDER_COUNT_QUERY, (fetch_from, end_date))
+            new_counts = cursor.fetchall()
+        except Exception as e:
+            print(f"❌ Error reading hourly usage store state: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    if store is not None:
+        print(f"Updating hourly usage store from watermark {store['watermark']}...")
+    else:
+        print(f"Building hourly usage store from {window_start}...")
+
+    delta = fetch_hourly_ingredient_usage(fetch_from, end_date)
+    if delta is None:
+        return None
+
+    delta_counts = pd.Series(
+        [count for _, count in new_counts],
+        index=pd.DatetimeIndex([hour for hour, _ in new_counts]),
+        dtype=np.int64
+    )
+
+    # Keep cached hours that are still inside the window and before the watermark
+    if store is not None:
+        cached = store['hourly']
+        cached_counts = store['order_counts']
+        keep = (cached.index >= kept_start) & (cached.index < store['watermark'])
+        cached, cached_counts = cached[keep], cached_counts[keep]
+        if not delta.empty and delta.index.tz is not None and cached.index.tz is not None:
+            delta.index = delta.index.tz_convert(cached.index.tz)
+            delta_counts.index = delta_counts.index.tz_convert(cached.index.tz)
+    else:
+        cached, cached_counts = pd.DataFrame(), pd.Series(dtype=np.int64)
+
+    order_counts = pd.concat([cached_counts, delta_counts])
+    order_counts = order_counts[order_counts > 0]
+    if order_counts.empty:
+        print("❌ No orders found in the requested range.")
+        return pd.DataFrame()
+
+    # Same grid as a full fetch: first order hour through one past the last
+    date_range = pd.date_range(start=order_counts.index.min(), end=order_counts.index.max() + pd.Timedelta(hours=1), freq='h')
+    columns = delta.columns.tolist() if not delta.empty else cached.columns.tolist()
+    hourly = pd.concat([cached, delta]).reindex(index=date_range, columns=columns).fillna(0.0).astype(float)
+    order_counts = order_counts.reindex(date_range, fill_value=0)
+
+    save_usage_store({
+        'hourly': hourly,
+        'order_counts': order_counts,
+        'watermark': order_counts[order_counts > 0].index.max(),
+        'recipe_checksum': recipe_checksum,
+        'anchor': anchor,
+    }, path)
+    print(f"✅ Hourly usage store saved with {len(hourly)} hours (new data from {len(delta_counts)} hours)")
+
+    return hourly